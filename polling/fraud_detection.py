@@ -7,7 +7,6 @@ from django.utils import timezone
 from django.db.models import Sum, Count, Q
 from django.conf import settings
 from .models import PaymentTransaction, Transaction, Player
-from .security import get_client_ip
 
 logger = logging.getLogger(__name__)
 
@@ -42,8 +41,11 @@ class FraudDetectionService:
                 risk_score += 10
                 risk_factors.append("Recent account (less than 1 month)")
             
+            # Factors 2-6 all read the payment history; fetch it in one query
+            stats = FraudDetectionService._get_transaction_stats(player)
+            
             # Factor 2: Transaction amount relative to account history
-            avg_transaction = FraudDetectionService._get_average_transaction_amount(player)
+            avg_transaction = stats['average_amount']
             if avg_transaction > 0:
                 amount_ratio = amount / avg_transaction
                 if amount_ratio > 10:
@@ -57,7 +59,7 @@ class FraudDetectionService:
                     risk_factors.append(f"Transaction amount {amount_ratio:.1f}x higher than average")
             
             # Factor 3: Transaction frequency
-            recent_transactions = FraudDetectionService._get_recent_transaction_count(player, hours=24)
+            recent_transactions = stats['recent_count']
             if recent_transactions > 10:
                 risk_score += 20
                 risk_factors.append(f"High transaction frequency: {recent_transactions} in 24h")
@@ -66,7 +68,7 @@ class FraudDetectionService:
                 risk_factors.append(f"Elevated transaction frequency: {recent_transactions} in 24h")
             
             # Factor 4: Failed payment attempts
-            failed_payments = FraudDetectionService._get_failed_payment_count(player, hours=24)
+            failed_payments = stats['failed_count']
             if failed_payments > 3:
                 risk_score += 25
                 risk_factors.append(f"Multiple failed payments: {failed_payments} in 24h")
@@ -76,7 +78,7 @@ class FraudDetectionService:
             
             # Factor 5: IP address changes
             if request:
-                ip_changes = FraudDetectionService._check_ip_changes(player, request)
+                ip_changes = stats['ip_count']
                 if ip_changes > 3:
                     risk_score += 20
                     risk_factors.append(f"Multiple IP addresses used: {ip_changes} in 24h")
@@ -86,7 +88,7 @@ class FraudDetectionService:
             
             # Factor 6: Large withdrawal after deposit (potential money laundering)
             if transaction_type == 'withdrawal':
-                recent_deposits = FraudDetectionService._get_recent_deposits(player, hours=72)
+                recent_deposits = stats['recent_deposits']
                 if recent_deposits > 0 and amount >= recent_deposits * 0.8:
                     risk_score += 30
                     risk_factors.append("Large withdrawal shortly after deposit")
@@ -118,59 +120,34 @@ class FraudDetectionService:
             return 50, ["Error calculating risk score"]  # Default to medium risk
     
     @staticmethod
-    def _get_average_transaction_amount(player):
-        """Get average transaction amount for player"""
-        avg_amount = PaymentTransaction.objects.filter(
-            player=player,
-            status='completed'
-        ).aggregate(avg=Sum('amount'))['avg']
-        return float(avg_amount) if avg_amount else 0
-    
-    @staticmethod
-    def _get_recent_transaction_count(player, hours=24):
-        """Get count of recent transactions"""
-        cutoff_time = timezone.now() - timedelta(hours=hours)
-        return PaymentTransaction.objects.filter(
-            player=player,
-            created_at__gte=cutoff_time
-        ).count()
-    
-    @staticmethod
-    def _get_failed_payment_count(player, hours=24):
-        """Get count of failed payments"""
-        cutoff_time = timezone.now() - timedelta(hours=hours)
-        return PaymentTransaction.objects.filter(
-            player=player,
-            status='failed',
-            created_at__gte=cutoff_time
-        ).count()
-    
-    @staticmethod
-    def _check_ip_changes(player, request):
-        """Check for IP address changes"""
-        current_ip = get_client_ip(request)
-        cutoff_time = timezone.now() - timedelta(hours=24)
-        
-        unique_ips = PaymentTransaction.objects.filter(
-            player=player,
-            created_at__gte=cutoff_time,
-            ip_address__isnull=False
-        ).values('ip_address').distinct().count()
+    def _get_transaction_stats(player, hours=24, deposit_hours=72):
+        """
+        Get the payment history figures used for scoring in a single aggregate query
+        """
+        now = timezone.now()
+        cutoff_time = now - timedelta(hours=hours)
+        deposit_cutoff = now - timedelta(hours=deposit_hours)
         
-        return unique_ips
-    
-    @staticmethod
-    def _get_recent_deposits(player, hours=72):
-        """Get total recent deposits"""
-        cutoff_time = timezone.now() - timedelta(hours=hours)
-        total_deposits = PaymentTransaction.objects.filter(
-            player=player,
-            transaction_type='deposit',
-            status='completed',
-            created_at__gte=cutoff_time
-        ).aggregate(total=Sum('amount'))['total']
+        stats = PaymentTransaction.objects.filter(player=player).aggregate(
+            completed_total=Sum('amount', filter=Q(status='completed')),
+            recent_count=Count('id', filter=Q(created_at__gte=cutoff_time)),
+            failed_count=Count('id', filter=Q(status='failed', created_at__gte=cutoff_time)),
+            ip_count=Count(
+                'ip_address', distinct=True,
+                filter=Q(created_at__gte=cutoff_time, ip_address__isnull=False)
+            ),
+            recent_deposits=Sum('amount', filter=Q(
+                transaction_type='deposit', status='completed', created_at__gte=deposit_cutoff
+            )),
+        )
         
-        return float(total_deposits) if total_deposits else 0
+        return {
+            'average_amount': float(stats['completed_total']) if stats['completed_total'] else 0,
+            'recent_count': stats['recent_count'],
+            'failed_count': stats['failed_count'],
+            'ip_count': stats['ip_count'],
+            'recent_deposits': float(stats['recent_deposits']) if stats['recent_deposits'] else 0,
+        }
     
     @staticmethod
     def should_flag_transaction(risk_score, risk_factors):
@@ -20,6 +20,26 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+# Notification types change rarely; cache lookups by name (invalidated by signals)
+NOTIFICATION_TYPE_CACHE_TIMEOUT = 3600
+
+
+def notification_type_cache_key(name: str) -> str:
+    return f"notification_type_{name}"
+
+
+def get_notification_type(name: str) -> Optional[NotificationType]:
+    """
+    Get an active notification type by name, caching it across calls
+    """
+    cache_key = notification_type_cache_key(name)
+    notification_type = cache.get(cache_key)
+    if notification_type is None:
+        notification_type = NotificationType.objects.filter(name=name, is_active=True).first()
+        if notification_type is not None:
+            cache.set(cache_key, notification_type, NOTIFICATION_TYPE_CACHE_TIMEOUT)
+    return notification_type
+
 
 class NotificationService:
     """
@@ -58,10 +78,9 @@ class NotificationService:
         """
         try:
             # Get notification type
-            notification_type = NotificationType.objects.get(
-                name=notification_type_name,
-                is_active=True
-            )
+            notification_type = get_notification_type(notification_type_name)
+            if notification_type is None:
+                raise NotificationType.DoesNotExist
             
             # Check user preferences
             preference = self.get_user_preference(user, notification_type)
@@ -69,22 +88,12 @@ class NotificationService:
                 logger.info(f"Notification {notification_type_name} disabled for user {user.username}")
                 return None
             
-            # Calculate expiration
-            expires_at = None
-            if expires_in_hours:
-                expires_at = timezone.now() + timezone.timedelta(hours=expires_in_hours)
-            
             # Create notification
-            notification = Notification.objects.create(
-                user=user,
-                notification_type=notification_type,
-                title=title,
-                message=message,
-                html_message=html_message or self.generate_html_message(title, message),
-                priority=priority,
-                extra_data=extra_data or {},
-                expires_at=expires_at
+            notification = self.build_notification(
+                user, notification_type, title, message,
+                html_message, priority, extra_data, expires_in_hours
             )
+            notification.save(force_insert=True)
             
             # Send notification based on user preferences
             self.deliver_notification(notification, preference)
@@ -99,6 +108,84 @@ class NotificationService:
             logger.error(f"Error creating notification: {e}")
             return None
     
+    def create_many(self, specs: List[Dict]) -> List[Notification]:
+        """
+        Create several notifications with a single INSERT
+        
+        Each spec holds the keyword arguments of create_notification. bulk_create
+        skips post_save, so the old-notification cleanup runs once per user after
+        the insert instead of once per row.
+        
+        Returns:
+            Created Notification objects (unknown or disabled types are skipped)
+        """
+        pending = []
+        for spec in specs:
+            spec = dict(spec)
+            user = spec.pop('user')
+            notification_type_name = spec.pop('notification_type_name')
+            
+            notification_type = get_notification_type(notification_type_name)
+            if notification_type is None:
+                logger.error(f"Notification type '{notification_type_name}' not found")
+                continue
+            
+            preference = self.get_user_preference(user, notification_type)
+            if not preference or not preference.is_enabled:
+                logger.info(f"Notification {notification_type_name} disabled for user {user.username}")
+                continue
+            
+            pending.append((self.build_notification(user, notification_type, **spec), preference))
+        
+        if not pending:
+            return []
+        
+        try:
+            notifications = Notification.objects.bulk_create([notification for notification, _ in pending])
+        except Exception as e:
+            logger.error(f"Error creating notifications: {e}")
+            return []
+        
+        # Stand-in for the post_save receiver that bulk_create bypasses
+        from .signals import cleanup_old_notifications
+        for notification in {n.user_id: n for n in notifications}.values():
+            cleanup_old_notifications(Notification, notification, created=True)
+        
+        for notification, preference in pending:
+            self.deliver_notification(notification, preference)
+        
+        logger.info(f"Created {len(notifications)} notifications in one batch")
+        return notifications
+    
+    def build_notification(
+        self,
+        user: Player,
+        notification_type: NotificationType,
+        title: str,
+        message: str,
+        html_message: str = "",
+        priority: str = "normal",
+        extra_data: Dict = None,
+        expires_in_hours: int = None
+    ) -> Notification:
+        """
+        Build an unsaved notification, filling in the HTML message and expiry
+        """
+        expires_at = None
+        if expires_in_hours:
+            expires_at = timezone.now() + timezone.timedelta(hours=expires_in_hours)
+        
+        return Notification(
+            user=user,
+            notification_type=notification_type,
+            title=title,
+            message=message,
+            html_message=html_message or self.generate_html_message(title, message),
+            priority=priority,
+            extra_data=extra_data or {},
+            expires_at=expires_at
+        )
+    
     def deliver_notification(self, notification: Notification, preference: UserNotificationPreference):
         """
         Deliver notification based on user preferences
@@ -240,7 +327,7 @@ class NotificationService:
         Get user preference for a notification type, create default if not exists
         """
         try:
-            preference = UserNotificationPreference.objects.get(
+            preference = UserNotificationPreference.objects.select_related('notification_type').get(
                 user=user,
                 notification_type=notification_type
             )
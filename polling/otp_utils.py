@@ -41,6 +41,14 @@ class OTPService:
         Returns (success, message)
         """
         try:
+            if getattr(settings, 'EMAIL_ASYNC_DELIVERY', False):
+                from .tasks import CELERY_AVAILABLE, send_otp_email_task
+
+                if CELERY_AVAILABLE:
+                    send_otp_email_task.delay(email, otp_code, "verification")
+                    return True, "OTP email queued for delivery"
+                logger.warning("EMAIL_ASYNC_DELIVERY is set but Celery is not installed, sending inline")
+
             # Use Brevo email service for OTP emails
             from .brevo_email_service import BrevoEmailService
 
@@ -5,8 +5,7 @@ import razorpay
 import logging
 import json
 import hmac
-import hashlib
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
 from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
@@ -22,6 +21,12 @@ logger = logging.getLogger(__name__)
 # Configure Razorpay
 razorpay_client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
 
+
+def inr_to_paise(amount):
+    """Convert a rupee amount to whole paise (Razorpay's unit), rounding half up"""
+    return int((Decimal(str(amount)) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
 class PaymentService:
     """Service for handling payment operations with Razorpay"""
 
@@ -59,7 +64,7 @@ class PaymentService:
                 return False, "Transaction blocked due to security concerns. Please contact support.", None
 
             # Convert amount to paise (smallest currency unit for INR)
-            amount_paise = int(amount * 100)
+            amount_paise = inr_to_paise(amount)
 
             # Create Razorpay order
             order_data = {
@@ -315,6 +320,23 @@ class PaymentService:
         
         return True, None
     
+    @staticmethod
+    def verify_webhook_signature(payload, signature):
+        """
+        Check a webhook's X-Razorpay-Signature against the raw payload bytes
+        Returns True if the signature matches
+        """
+        if not signature:
+            return False
+
+        expected_signature = hmac.new(
+            settings.RAZORPAY_WEBHOOK_SECRET.encode('utf-8'),
+            payload,
+            'sha256'
+        ).hexdigest()
+
+        return hmac.compare_digest(expected_signature, signature)
+
     @staticmethod
     def handle_webhook(payload, sig_header):
         """
@@ -323,13 +345,7 @@ class PaymentService:
         """
         try:
             # Verify webhook signature
-            expected_signature = hmac.new(
-                settings.RAZORPAY_WEBHOOK_SECRET.encode('utf-8'),
-                payload,
-                hashlib.sha256
-            ).hexdigest()
-
-            if not hmac.compare_digest(expected_signature, sig_header):
+            if not PaymentService.verify_webhook_signature(payload, sig_header):
                 logger.error("Invalid webhook signature")
                 return False, "Invalid signature"
 
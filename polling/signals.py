@@ -12,12 +12,12 @@ from django.core.cache import cache
 
 from .models import (
     Player, Transaction, Bet, GameRound, 
-    Notification, OTPVerification
+    Notification, NotificationType, OTPVerification
 )
 from .notification_service import (
     notify_game_result, notify_wallet_transaction, 
     notify_account_activity, notify_security_alert,
-    notify_system_announcement
+    notify_system_announcement, notification_type_cache_key
 )
 
 logger = logging.getLogger(__name__)
@@ -586,3 +586,12 @@ def cleanup_old_notifications(sender, instance, created, **kwargs):
             
     except Exception as e:
         logger.error(f"Error cleaning up old notifications: {e}")
+
+
+@receiver(post_save, sender=NotificationType)
+@receiver(post_delete, sender=NotificationType)
+def invalidate_notification_type_cache(sender, instance, **kwargs):
+    """
+    Drop the cached lookup so the next notification sees the change
+    """
+    cache.delete(notification_type_cache_key(instance.name))
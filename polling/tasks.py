@@ -324,6 +324,16 @@ def send_promotional_notifications():
         return f"Error: {str(e)}"
 
 
+@shared_task
+def send_otp_email_task(email, otp_code, purpose="verification"):
+    """
+    Send an OTP email outside the request/response cycle
+    """
+    from .brevo_email_service import BrevoEmailService
+
+    return BrevoEmailService.send_otp_email(email, otp_code, purpose)
+
+
 # Utility function to run tasks manually if Celery is not available
 def run_scheduled_tasks():
     """
@@ -70,7 +70,8 @@ class ColoredOutput:
 class TestRunner:
     """Main test runner class."""
     
-    def __init__(self):
+    def __init__(self, parallel=None):
+        self.parallel = parallel
         self.test_suites = {
             'auth': 'tests.test_authentication',
             'game': 'tests.test_game_mechanics',
@@ -137,6 +138,8 @@ class TestRunner:
     def run_django_tests(self, test_pattern, verbosity=1):
         """Run Django tests with specified pattern."""
         command = f"python manage.py test {test_pattern} --verbosity={verbosity}"
+        if self.parallel:
+            command += f" --parallel={self.parallel}"
         return self.run_command(command, f"Django tests: {test_pattern}")
     
     def run_all_tests(self, verbosity=1):
@@ -309,10 +312,12 @@ def main():
                        help='Set up test data')
     parser.add_argument('--coverage', action='store_true',
                        help='Generate coverage report')
+    parser.add_argument('--parallel', nargs='?', const='auto', default=None,
+                       help='Run test classes in parallel workers (default: auto)')
     
     args = parser.parse_args()
     
-    runner = TestRunner()
+    runner = TestRunner(parallel=args.parallel)
     
     # Check environment if requested
     if args.check:
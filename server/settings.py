@@ -218,6 +218,10 @@ EMAIL_USE_SSL = False  # Use TLS for Brevo SMTP
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 
+# Hand OTP emails to a Celery worker instead of sending them inside the
+# request (requires Celery and a configured broker)
+EMAIL_ASYNC_DELIVERY = os.getenv('EMAIL_ASYNC_DELIVERY', 'False').lower() == 'true'
+
 # Brevo Configuration
 BREVO_API_KEY = os.getenv('BREVO_API_KEY', '')
 BREVO_SMTP_KEY = os.getenv('BREVO_SMTP_KEY', '')
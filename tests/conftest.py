@@ -3,8 +3,12 @@ Test configuration and fixtures for the Color Prediction Game test suite.
 This file contains test utilities and simple factories used across all test modules.
 """
 
+import hmac
 import os
+from unittest.mock import patch
+
 import django
+import pytest
 from django.conf import settings
 
 # Configure Django settings for tests
@@ -128,7 +132,98 @@ def NotificationTypeFactory(**kwargs):
     return NotificationType.objects.create(**defaults)
 
 
-# Django test utilities (no pytest fixtures needed)
+# Pytest fixtures for function-style test modules
+
+
+@pytest.fixture(scope='module')
+def shared_player_row(django_db_setup, django_db_blocker):
+    """Verified player row created once and shared by every test in a module.
+
+    The row is removed on module teardown so row-counting tests elsewhere
+    stay exact. Tests should use shared_player rather than this instance.
+    """
+    with django_db_blocker.unblock():
+        player = PlayerFactory(username='shared', email='shared@example.com', email_verified=True)
+    yield player
+    with django_db_blocker.unblock():
+        Player.objects.filter(pk=player.pk).delete()
+
+
+@pytest.fixture
+def shared_player(shared_player_row, db):
+    """Fresh copy of the shared player for a single test.
+
+    Database writes are rolled back after each test, and reloading the row
+    drops any attribute changes an earlier test left on the instance.
+    """
+    shared_player_row.refresh_from_db()
+    return shared_player_row
+
+
+@pytest.fixture(scope='module')
+def auth_client(shared_player_row):
+    """Client logged in as the shared player, built once per module.
+
+    The custom auth reads the player from the session, so the login is just a
+    session write; reusing the client keeps that out of every test.
+    """
+    client = Client()
+    session = client.session
+    session.update({
+        'is_authenticated': True,
+        'user_id': shared_player_row.id,
+        'username': shared_player_row.username,
+    })
+    session.save()
+    return client
+
+
+@pytest.fixture
+def mock_razorpay():
+    """Stand-in for the shared Razorpay client; orders echo back what was sent."""
+    with patch('polling.payment_service.razorpay_client') as client:
+        client.order.create.side_effect = lambda data: {
+            'id': 'order_test',
+            'amount': data['amount'],
+            'currency': data['currency'],
+            'receipt': data['receipt'],
+            'status': 'created',
+        }
+        yield client
+
+
+# Canned payment.captured event; a byte literal keeps the signed bytes stable
+WEBHOOK_PAYLOAD = (
+    b'{"event": "payment.captured", "payload": {"payment": {"entity": '
+    b'{"id": "pay_test123", "order_id": "order_test123", "amount": 10000, '
+    b'"currency": "INR", "status": "captured"}}}}'
+)
+
+
+@pytest.fixture(scope='module')
+def signed_webhook():
+    """Webhook payload and its signature under the configured webhook secret."""
+    secret = settings.RAZORPAY_WEBHOOK_SECRET.encode('utf-8')
+    return WEBHOOK_PAYLOAD, hmac.new(secret, WEBHOOK_PAYLOAD, 'sha256').hexdigest()
+
+
+@pytest.fixture
+def smtp_credentials(settings):
+    """Fake SMTP credentials so the Brevo service builds a (locmem) connection."""
+    settings.EMAIL_HOST_USER = 'test@example.com'
+    settings.EMAIL_HOST_PASSWORD = 'test-password'
+
+
+@pytest.fixture
+def in_memory_storage(settings):
+    """Keep uploaded files in memory instead of writing them under MEDIA_ROOT."""
+    settings.STORAGES = {
+        **settings.STORAGES,
+        'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    }
+
+
+# Django test utilities
 
 
 class BaseTestCase(TestCase):
@@ -6,7 +6,7 @@ Tests all API endpoints, security measures, rate limiting, and error handling.
 import json
 import time
 from unittest.mock import patch, Mock
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
@@ -17,8 +17,10 @@ from tests.utils import (
     TestClient, AssertionHelpers, SecurityTestHelpers, 
     setup_test_notification_types
 )
+from tests.misc.test_settings import MIDDLEWARE_API
 
 
+@override_settings(MIDDLEWARE=MIDDLEWARE_API)
 class PublicAPITests(BaseTestCase):
     """Test public API endpoints that don't require authentication."""
     
@@ -90,6 +92,7 @@ class PublicAPITests(BaseTestCase):
         self.assertEqual(data['betting_stats']['green']['total_amount'], 200)
 
 
+@override_settings(MIDDLEWARE=MIDDLEWARE_API)
 class AuthenticatedAPITests(BaseTestCase):
     """Test API endpoints that require user authentication."""
     
@@ -163,6 +166,7 @@ class AuthenticatedAPITests(BaseTestCase):
             self.assertEqual(response.status_code, 401, f"Endpoint {endpoint} should require authentication")
 
 
+@override_settings(MIDDLEWARE=MIDDLEWARE_API)
 class APISecurityTests(BaseTestCase):
     """Test API security measures."""
     
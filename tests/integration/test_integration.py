@@ -6,7 +6,7 @@ Tests complete user workflows and system interactions end-to-end.
 import json
 import time
 from unittest.mock import patch, Mock
-from django.test import TestCase, TransactionTestCase
+from django.test import TestCase
 from django.utils import timezone
 from datetime import timedelta
 
@@ -375,7 +375,7 @@ class WithdrawalIntegrationTest(BaseTestCase):
         self.assertIsNotNone(master_transaction)
 
 
-class MultiPlayerGameIntegrationTest(TransactionTestCase):
+class MultiPlayerGameIntegrationTest(TestCase):
     """Test multi-player game scenarios."""
     
     def setUp(self):
@@ -7,16 +7,47 @@ python tests/load_test.py --users 100 --duration 60 --bet-rate 2
 """
 import asyncio
 import aiohttp
-import websockets
 import json
 import time
 import random
 import argparse
+import itertools
+import logging
+import logging.handlers
+import queue
 import statistics
+import sys
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import List, Dict
 
+logger = logging.getLogger(__name__)
+
+BET_COLORS = ['red', 'green', 'violet', 'blue']
+BET_AMOUNTS = [100, 200, 500, 1000]  # ₹1, ₹2, ₹5, ₹10
+API_ENDPOINTS = [
+    '/api/responsible-gambling/status/',
+    '/api/monitoring/dashboard/',
+    '/game-history/',
+]
+# Entries in each user's pre-sampled API request plan
+REQUEST_PLAN_SIZE = 256
+
+
+def configure_logging(level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """Route log records through a queue so stdout writes happen off the event loop"""
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter('%(message)s'))
+    
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(level)
+    logger.propagate = False
+    
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
+
 
 @dataclass
 class TestResult:
@@ -24,11 +55,12 @@ class TestResult:
     total_requests: int = 0
     successful_requests: int = 0
     failed_requests: int = 0
-    response_times: List[float] = None
+    response_times: List[int] = None  # nanoseconds, from time.perf_counter_ns()
     websocket_connections: int = 0
     websocket_failures: int = 0
     bet_successes: int = 0
     bet_failures: int = 0
+    simulation_errors: int = 0
     
     def __post_init__(self):
         if self.response_times is None:
@@ -38,11 +70,19 @@ class TestResult:
 class LoadTester:
     """Load testing framework for the game system"""
     
-    def __init__(self, base_url: str = "http://localhost:8000", ws_url: str = "ws://localhost:8000"):
+    def __init__(self, base_url: str = "http://localhost:8000", ws_url: str = "ws://localhost:8000",
+                 concurrency: int = 100, pipeline_workers: int = 4):
         self.base_url = base_url
         self.ws_url = ws_url
         self.results = TestResult()
         self.active_sessions = []
+        # Caps concurrent WebSocket handshakes so large --users runs ramp up
+        # instead of overflowing the server's accept queue
+        self._connect_sem = asyncio.Semaphore(concurrency)
+        # Concurrent API requests kept in flight per simulated user
+        self.pipeline_workers = pipeline_workers
+        # Shared by every user session so DNS lookups and pooled connections are reused
+        self._connector = None
         
     async def create_test_user(self, session: aiohttp.ClientSession, user_id: int) -> Dict:
         """Create a test user account"""
@@ -55,10 +95,9 @@ class LoadTester:
                 'confirm_password': 'testpass123'
             }
             
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             async with session.post(f"{self.base_url}/register/", data=register_data) as resp:
-                response_time = time.time() - start_time
-                self.results.response_times.append(response_time)
+                self.results.response_times.append(time.perf_counter_ns() - start_ns)
                 self.results.total_requests += 1
                 
                 if resp.status == 200 or resp.status == 302:  # Success or redirect
@@ -73,7 +112,7 @@ class LoadTester:
                     return None
                     
         except Exception as e:
-            print(f"Error creating user {user_id}: {e}")
+            logger.warning("Error creating user %s: %s", user_id, e)
             self.results.failed_requests += 1
             return None
     
@@ -85,10 +124,9 @@ class LoadTester:
                 'password': user_data['password']
             }
             
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             async with session.post(f"{self.base_url}/login/", data=login_data) as resp:
-                response_time = time.time() - start_time
-                self.results.response_times.append(response_time)
+                self.results.response_times.append(time.perf_counter_ns() - start_ns)
                 self.results.total_requests += 1
                 
                 if resp.status == 200 or resp.status == 302:
@@ -99,32 +137,46 @@ class LoadTester:
                     return False
                     
         except Exception as e:
-            print(f"Error logging in user {user_data['username']}: {e}")
+            logger.warning("Error logging in user %s: %s", user_data['username'], e)
             self.results.failed_requests += 1
             return False
     
-    async def websocket_client(self, user_data: Dict, duration: int, bet_rate: float):
+    async def websocket_client(self, session: aiohttp.ClientSession, user_data: Dict, duration: int, bet_rate: float):
         """Simulate a WebSocket client for a user"""
         try:
             # Connect to WebSocket
             uri = f"{self.ws_url}/ws/game/main/"
-            async with websockets.connect(uri) as websocket:
+            # Only the handshake is gated; the semaphore is released before the recv loop
+            async with self._connect_sem:
+                # Game frames are small JSON control messages, so permessage-deflate
+                # only costs CPU on both ends. The heartbeat keeps idle connections alive.
+                websocket = await session.ws_connect(uri, compress=0, heartbeat=20, max_msg_size=65536)
+            async with websocket:
                 self.results.websocket_connections += 1
-                print(f"WebSocket connected for user {user_data['username']}")
+                logger.debug("WebSocket connected for user %s", user_data['username'])
                 
                 # Send initial game state request
-                await websocket.send(json.dumps({
+                await websocket.send_str(json.dumps({
                     'type': 'get_game_state'
                 }))
                 
+                # Sample every bet choice up front instead of calling random.choice per bet
+                sample_size = int(duration * bet_rate) + 16
+                bet_choices = itertools.cycle(zip(
+                    random.choices(BET_COLORS, k=sample_size),
+                    random.choices(BET_AMOUNTS, k=sample_size)
+                ))
+                
                 start_time = time.time()
                 last_bet_time = 0
                 
                 while time.time() - start_time < duration:
                     try:
                         # Listen for messages with timeout
-                        message = await asyncio.wait_for(websocket.recv(), timeout=1.0)
-                        data = json.loads(message)
+                        message = await websocket.receive(timeout=1.0)
+                        if message.type != aiohttp.WSMsgType.TEXT:
+                            break
+                        data = json.loads(message.data)
                         
                         # Handle different message types
                         if data.get('type') == 'game_state':
@@ -134,13 +186,14 @@ class LoadTester:
                                 data.get('phase') == 'betting' and 
                                 not data.get('betting_closed')):
                                 
-                                await self.place_bet(websocket, user_data)
+                                color, amount = next(bet_choices)
+                                await self.place_bet(websocket, user_data, color, amount)
                                 last_bet_time = current_time
                         
                         elif data.get('type') == 'timer_update':
                             # Acknowledge timer updates if required
                             if data.get('requires_ack'):
-                                await websocket.send(json.dumps({
+                                await websocket.send_str(json.dumps({
                                     'type': 'message_ack',
                                     'message_id': data.get('message_id')
                                 }))
@@ -148,94 +201,128 @@ class LoadTester:
                         elif data.get('type') == 'round_ended':
                             # Acknowledge round end messages
                             if data.get('requires_ack'):
-                                await websocket.send(json.dumps({
+                                await websocket.send_str(json.dumps({
                                     'type': 'message_ack',
                                     'message_id': data.get('message_id')
                                 }))
+                        
+                        elif data.get('type') == 'ping':
+                            # The consumer only counts text messages as heartbeats;
+                            # protocol-level pings from aiohttp never reach it
+                            await websocket.send_str(json.dumps({'type': 'pong'}))
                     
                     except asyncio.TimeoutError:
-                        # Send ping to keep connection alive
-                        await websocket.send(json.dumps({
-                            'type': 'ping',
-                            'timestamp': time.time()
-                        }))
+                        # Nothing received yet; keep listening
+                        continue
                     
                     except Exception as e:
-                        print(f"WebSocket error for user {user_data['username']}: {e}")
+                        logger.warning("WebSocket error for user %s: %s", user_data['username'], e)
                         break
                 
-                print(f"WebSocket session ended for user {user_data['username']}")
+                logger.debug("WebSocket session ended for user %s", user_data['username'])
                 
         except Exception as e:
-            print(f"WebSocket connection failed for user {user_data['username']}: {e}")
+            logger.warning("WebSocket connection failed for user %s: %s", user_data['username'], e)
             self.results.websocket_failures += 1
     
-    async def place_bet(self, websocket, user_data: Dict):
+    async def place_bet(self, websocket, user_data: Dict, color: str, amount: int):
         """Place a bet through WebSocket"""
         try:
-            colors = ['red', 'green', 'violet', 'blue']
-            bet_amounts = [100, 200, 500, 1000]  # ₹1, ₹2, ₹5, ₹10
-            
             bet_data = {
                 'type': 'place_bet',
                 'bet_type': 'color',
-                'color': random.choice(colors),
-                'amount': random.choice(bet_amounts),
+                'color': color,
+                'amount': amount,
                 'timestamp': time.time()
             }
             
-            await websocket.send(json.dumps(bet_data))
+            await websocket.send_str(json.dumps(bet_data))
             
             # Wait for response
-            response = await asyncio.wait_for(websocket.recv(), timeout=5.0)
-            response_data = json.loads(response)
+            response = await websocket.receive(timeout=5.0)
+            if response.type != aiohttp.WSMsgType.TEXT:
+                # CLOSE/ERROR frames carry no JSON; count them instead of failing to parse
+                self.results.bet_failures += 1
+                logger.warning("Bet for user %s got a %s frame instead of a reply",
+                               user_data['username'], response.type.name)
+                return
+            response_data = json.loads(response.data)
             
             if response_data.get('type') == 'bet_placed':
                 self.results.bet_successes += 1
-                print(f"Bet placed successfully for user {user_data['username']}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Bet placed successfully for user %s", user_data['username'])
             else:
                 self.results.bet_failures += 1
-                print(f"Bet failed for user {user_data['username']}: {response_data.get('message', 'Unknown error')}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Bet failed for user %s: %s", user_data['username'],
+                                 response_data.get('message', 'Unknown error'))
                 
         except Exception as e:
             self.results.bet_failures += 1
-            print(f"Error placing bet for user {user_data['username']}: {e}")
+            logger.warning("Error placing bet for user %s: %s", user_data['username'], e)
     
     async def api_load_test(self, session: aiohttp.ClientSession, duration: int):
         """Test API endpoints under load"""
-        start_time = time.time()
+        workers = self.pipeline_workers
+        request_queue = asyncio.Queue(maxsize=workers * 2)
         
-        endpoints = [
-            '/api/responsible-gambling/status/',
-            '/api/monitoring/dashboard/',
-            '/game-history/',
-        ]
+        # A small pre-sampled block, cycled for the whole run, keeps memory flat
+        # however long the test runs or however many users it simulates
+        request_plan = itertools.cycle(zip(
+            random.choices(API_ENDPOINTS, k=REQUEST_PLAN_SIZE),
+            [random.uniform(0.1, 1.0) for _ in range(REQUEST_PLAN_SIZE)]
+        ))
         
-        while time.time() - start_time < duration:
-            try:
-                endpoint = random.choice(endpoints)
-                
-                start_req = time.time()
-                async with session.get(f"{self.base_url}{endpoint}") as resp:
-                    response_time = time.time() - start_req
-                    self.results.response_times.append(response_time)
-                    self.results.total_requests += 1
+        async def produce():
+            start_time = time.time()
+            while time.time() - start_time < duration:
+                endpoint, delay = next(request_plan)
+                await request_queue.put(endpoint)
+                # Random delay between requests, shared across the workers
+                await asyncio.sleep(delay / workers)
+            
+            for _ in range(workers):
+                await request_queue.put(None)
+        
+        async def consume():
+            while (endpoint := await request_queue.get()) is not None:
+                try:
+                    start_ns = time.perf_counter_ns()
+                    async with session.get(f"{self.base_url}{endpoint}") as resp:
+                        self.results.response_times.append(time.perf_counter_ns() - start_ns)
+                        self.results.total_requests += 1
+                        
+                        if resp.status == 200:
+                            self.results.successful_requests += 1
+                        else:
+                            self.results.failed_requests += 1
                     
-                    if resp.status == 200:
-                        self.results.successful_requests += 1
-                    else:
-                        self.results.failed_requests += 1
-                
-                # Random delay between requests
-                await asyncio.sleep(random.uniform(0.1, 1.0))
+                except Exception as e:
+                    self.results.failed_requests += 1
+                    logger.warning("API request error: %s", e)
+        
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(produce())
+            for _ in range(workers):
+                tg.create_task(consume())
+    
+    async def warmup(self):
+        """Prime the DNS cache and connection pool before measuring"""
+        try:
+            async with aiohttp.ClientSession(connector=self._connector, connector_owner=False) as session:
+                async with session.head(f"{self.base_url}/") as resp:
+                    await resp.release()
                 
-            except Exception as e:
-                self.results.failed_requests += 1
-                print(f"API request error: {e}")
+                async with session.ws_connect(f"{self.ws_url}/ws/game/main/"):
+                    pass
+        except Exception as e:
+            logger.warning("Warm-up failed: %s", e)
     
     async def run_user_simulation(self, user_id: int, duration: int, bet_rate: float):
         """Run complete user simulation"""
-        async with aiohttp.ClientSession() as session:
+        # Each user keeps its own cookie jar but shares the pooled connector
+        async with aiohttp.ClientSession(connector=self._connector, connector_owner=False) as session:
             # Create and login user
             user_data = await self.create_test_user(session, user_id)
             if not user_data:
@@ -247,29 +334,37 @@ class LoadTester:
             
             # Run WebSocket simulation and API testing concurrently
             tasks = [
-                self.websocket_client(user_data, duration, bet_rate),
+                self.websocket_client(session, user_data, duration, bet_rate),
                 self.api_load_test(session, duration)
             ]
             
-            await asyncio.gather(*tasks, return_exceptions=True)
+            outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+            for outcome in outcomes:
+                if isinstance(outcome, BaseException):
+                    self.results.simulation_errors += 1
+                    logger.error("Simulation task failed for user %s", user_data['username'],
+                                 exc_info=outcome)
     
     async def run_load_test(self, num_users: int, duration: int, bet_rate: float):
         """Run the complete load test"""
         print(f"Starting load test with {num_users} users for {duration} seconds")
         print(f"Bet rate: {bet_rate} bets per second per user")
         
-        start_time = time.time()
-        
-        # Create tasks for all users
-        tasks = []
-        for user_id in range(num_users):
-            task = self.run_user_simulation(user_id, duration, bet_rate)
-            tasks.append(task)
-        
-        # Run all user simulations concurrently
-        await asyncio.gather(*tasks, return_exceptions=True)
-        
-        total_time = time.time() - start_time
+        self._connector = aiohttp.TCPConnector(ttl_dns_cache=300)
+        try:
+            # Keep DNS/TCP setup cost out of the measured window
+            await self.warmup()
+            
+            start_time = time.time()
+            
+            # Run all user simulations concurrently
+            async with asyncio.TaskGroup() as tg:
+                for user_id in range(num_users):
+                    tg.create_task(self.run_user_simulation(user_id, duration, bet_rate))
+            
+            total_time = time.time() - start_time
+        finally:
+            await self._connector.close()
         
         # Print results
         self.print_results(total_time)
@@ -293,10 +388,10 @@ class LoadTester:
             print(f"Requests per second: {requests_per_second:.2f}")
         
         if self.results.response_times:
-            avg_response_time = statistics.mean(self.results.response_times)
-            median_response_time = statistics.median(self.results.response_times)
-            max_response_time = max(self.results.response_times)
-            min_response_time = min(self.results.response_times)
+            avg_response_time = statistics.mean(self.results.response_times) / 1e9
+            median_response_time = statistics.median(self.results.response_times) / 1e9
+            max_response_time = max(self.results.response_times) / 1e9
+            min_response_time = min(self.results.response_times) / 1e9
             
             print(f"\nResponse Times:")
             print(f"  Average: {avg_response_time:.3f}s")
@@ -316,6 +411,8 @@ class LoadTester:
             bet_success_rate = (self.results.bet_successes / (self.results.bet_successes + self.results.bet_failures)) * 100
             print(f"  Bet success rate: {bet_success_rate:.2f}%")
         
+        print(f"\nFailed user simulation tasks: {self.results.simulation_errors}")
+        
         print("\n" + "="*60)
 
 
@@ -327,11 +424,18 @@ async def main():
     parser.add_argument('--bet-rate', type=float, default=0.5, help='Bets per second per user')
     parser.add_argument('--base-url', default='http://localhost:8000', help='Base URL of the application')
     parser.add_argument('--ws-url', default='ws://localhost:8000', help='WebSocket URL of the application')
+    parser.add_argument('--concurrency', type=int, default=100, help='Maximum concurrent WebSocket handshakes')
+    parser.add_argument('--pipeline-workers', type=int, default=4, help='Concurrent API requests per user')
+    parser.add_argument('--verbose', action='store_true', help='Log every connection and bet')
     
     args = parser.parse_args()
     
-    tester = LoadTester(args.base_url, args.ws_url)
-    await tester.run_load_test(args.users, args.duration, args.bet_rate)
+    listener = configure_logging(logging.DEBUG if args.verbose else logging.INFO)
+    try:
+        tester = LoadTester(args.base_url, args.ws_url, args.concurrency, args.pipeline_workers)
+        await tester.run_load_test(args.users, args.duration, args.bet_rate)
+    finally:
+        listener.stop()
 
 
 if __name__ == '__main__':
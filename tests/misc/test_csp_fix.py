@@ -3,6 +3,7 @@
 Test CSP fix for Razorpay
 """
 import os
+import re
 import sys
 import django
 
@@ -15,6 +16,9 @@ from django.test import Client
 from polling.models import Player
 from django.utils import timezone
 
+# Every CSP token the test looks for, matched in a single pass over the header
+_CSP_RE = re.compile(r"https://(?:checkout|api|lumberjack)\.razorpay\.com|frame-src")
+
 def test_csp_headers():
     """Test that CSP headers allow Razorpay"""
     print("🧪 Testing CSP Headers for Razorpay...")
@@ -23,7 +27,7 @@ def test_csp_headers():
     
     # Create test user and login
     try:
-        player = Player.objects.get(username='test_csp_user')
+        player = Player.objects.only('id', 'username').get(username='test_csp_user')
     except Player.DoesNotExist:
         player = Player.objects.create(
             username='test_csp_user',
@@ -35,9 +39,11 @@ def test_csp_headers():
     
     # Login user
     session = client.session
-    session['is_authenticated'] = True
-    session['user_id'] = player.id
-    session['username'] = player.username
+    session.update({
+        'is_authenticated': True,
+        'user_id': player.id,
+        'username': player.username,
+    })
     session.save()
     
     # Get payment dashboard
@@ -49,30 +55,30 @@ def test_csp_headers():
         # Check CSP header
         csp_header = response.get('Content-Security-Policy', '')
         print(f"📋 CSP Header: {csp_header}")
+        csp_tokens = {match.group(0) for match in _CSP_RE.finditer(csp_header)}
         
-        if 'https://checkout.razorpay.com' in csp_header:
+        if 'https://checkout.razorpay.com' in csp_tokens:
             print("✅ Razorpay domain found in script-src")
         else:
             print("❌ Razorpay domain NOT found in script-src")
             
-        if 'https://api.razorpay.com' in csp_header:
+        if 'https://api.razorpay.com' in csp_tokens:
             print("✅ Razorpay API domain found in connect-src")
         else:
             print("❌ Razorpay API domain NOT found in connect-src")
 
-        if 'https://lumberjack.razorpay.com' in csp_header:
+        if 'https://lumberjack.razorpay.com' in csp_tokens:
             print("✅ Razorpay Lumberjack domain found in connect-src")
         else:
             print("❌ Razorpay Lumberjack domain NOT found in connect-src")
 
-        if 'frame-src' in csp_header and 'https://api.razorpay.com' in csp_header:
+        if 'frame-src' in csp_tokens and 'https://api.razorpay.com' in csp_tokens:
             print("✅ Razorpay frame-src configured")
         else:
             print("❌ Razorpay frame-src NOT configured")
             
         # Check if Razorpay key is in response
-        content = response.content.decode()
-        if 'rzp_test_Wdl1blkg3PBf6z' in content:
+        if response.content.find(b'rzp_test_Wdl1blkg3PBf6z') != -1:
             print("✅ Razorpay key found in template")
         else:
             print("❌ Razorpay key not found in template")
@@ -3,15 +3,56 @@ Comprehensive test runner for the Color Prediction Game.
 Runs all test suites and generates detailed reports.
 """
 
+import ast
+import contextlib
+import functools
+import io
 import os
 import sys
 import time
 import unittest
-from io import StringIO
-from django.test.runner import DiscoverRunner
-from django.test.utils import get_runner
+from concurrent.futures import ProcessPoolExecutor
+from django.test import TestCase, TransactionTestCase
+from django.test.runner import DiscoverRunner, iter_test_cases
 from django.conf import settings
-from django.core.management import execute_from_command_line
+
+
+# ANSI colors, disabled when stdout isn't a terminal or NO_COLOR is set
+_USE_COLOR = sys.stdout.isatty() and 'NO_COLOR' not in os.environ
+GREEN, RED, YELLOW, BOLD, RESET = (
+    ("\033[92m", "\033[91m", "\033[93m", "\033[1m", "\033[0m") if _USE_COLOR else ("",) * 5
+)
+
+# Per-test status markers
+PASS_MARK = f"{GREEN}✓ PASS{RESET}"
+ERROR_MARK = f"{RED}✗ ERROR{RESET}"
+FAIL_MARK = f"{RED}✗ FAIL{RESET}"
+SKIP_MARK = f"{YELLOW}- SKIP{RESET}"
+
+
+class _BufferedStream:
+    """In-memory stand-in for a result stream, written out in one go."""
+    
+    def __init__(self):
+        self._buffer = io.StringIO()
+    
+    def write(self, text):
+        self._buffer.write(text)
+    
+    def writeln(self, text=None):
+        if text:
+            self._buffer.write(text)
+        self._buffer.write('\n')
+    
+    def flush(self):
+        """Writes are only forwarded by drain_to()."""
+    
+    def drain_to(self, stream):
+        output = self._buffer.getvalue()
+        if output:
+            stream.write(output)
+            stream.flush()
+            self._buffer = io.StringIO()
 
 
 class ColoredTestResult(unittest.TextTestResult):
@@ -19,40 +60,51 @@ class ColoredTestResult(unittest.TextTestResult):
     
     def __init__(self, stream, descriptions, verbosity):
         super().__init__(stream, descriptions, verbosity)
+        self.verbosity = verbosity
         self.success_count = 0
         self.start_time = None
+        # Per-test lines are collected and written once per test run
+        self._output_stream = self.stream
+        self.stream = _BufferedStream()
     
     def startTest(self, test):
         super().startTest(test)
         self.start_time = time.time()
         if self.verbosity > 1:
             self.stream.write(f"Running {test._testMethodName}... ")
-            self.stream.flush()
     
     def addSuccess(self, test):
         super().addSuccess(test)
         self.success_count += 1
         if self.verbosity > 1:
             elapsed = time.time() - self.start_time
-            self.stream.write(f"\033[92m✓ PASS\033[0m ({elapsed:.3f}s)\n")
+            self.stream.write(f"{PASS_MARK} ({elapsed:.3f}s)\n")
     
     def addError(self, test, err):
         super().addError(test, err)
         if self.verbosity > 1:
             elapsed = time.time() - self.start_time
-            self.stream.write(f"\033[91m✗ ERROR\033[0m ({elapsed:.3f}s)\n")
+            self.stream.write(f"{ERROR_MARK} ({elapsed:.3f}s)\n")
     
     def addFailure(self, test, err):
         super().addFailure(test, err)
         if self.verbosity > 1:
             elapsed = time.time() - self.start_time
-            self.stream.write(f"\033[91m✗ FAIL\033[0m ({elapsed:.3f}s)\n")
+            self.stream.write(f"{FAIL_MARK} ({elapsed:.3f}s)\n")
     
     def addSkip(self, test, reason):
         super().addSkip(test, reason)
         if self.verbosity > 1:
             elapsed = time.time() - self.start_time
-            self.stream.write(f"\033[93m- SKIP\033[0m ({elapsed:.3f}s): {reason}\n")
+            self.stream.write(f"{SKIP_MARK} ({elapsed:.3f}s): {reason}\n")
+    
+    def stopTestRun(self):
+        super().stopTestRun()
+        self.stream.drain_to(self._output_stream)
+    
+    def printErrors(self):
+        super().printErrors()
+        self.stream.drain_to(self._output_stream)
 
 
 class ColoredTestRunner(unittest.TextTestRunner):
@@ -63,10 +115,12 @@ class ColoredTestRunner(unittest.TextTestRunner):
     def run(self, test):
         result = super().run(test)
         
-        # Print summary
-        print("\n" + "="*70)
-        print(f"\033[1mTEST SUMMARY\033[0m")
-        print("="*70)
+        # Build the summary and write it in one go
+        lines = []
+        append = lines.append
+        append("\n" + "="*70)
+        append(f"{BOLD}TEST SUMMARY{RESET}")
+        append("="*70)
         
         total_tests = result.testsRun
         failures = len(result.failures)
@@ -74,63 +128,205 @@ class ColoredTestRunner(unittest.TextTestRunner):
         skipped = len(result.skipped)
         success = result.success_count
         
-        print(f"Total Tests: {total_tests}")
-        print(f"\033[92mPassed: {success}\033[0m")
+        append(f"Total Tests: {total_tests}")
+        append(f"{GREEN}Passed: {success}{RESET}")
         if failures > 0:
-            print(f"\033[91mFailed: {failures}\033[0m")
+            append(f"{RED}Failed: {failures}{RESET}")
         if errors > 0:
-            print(f"\033[91mErrors: {errors}\033[0m")
+            append(f"{RED}Errors: {errors}{RESET}")
         if skipped > 0:
-            print(f"\033[93mSkipped: {skipped}\033[0m")
+            append(f"{YELLOW}Skipped: {skipped}{RESET}")
         
         success_rate = (success / total_tests * 100) if total_tests > 0 else 0
-        print(f"Success Rate: {success_rate:.1f}%")
+        append(f"Success Rate: {success_rate:.1f}%")
         
         if failures == 0 and errors == 0:
-            print(f"\n\033[92m🎉 ALL TESTS PASSED! 🎉\033[0m")
+            append(f"\n{GREEN}🎉 ALL TESTS PASSED! 🎉{RESET}")
         else:
-            print(f"\n\033[91m❌ SOME TESTS FAILED\033[0m")
+            append(f"\n{RED}❌ SOME TESTS FAILED{RESET}")
         
+        sys.stdout.write("\n".join(lines) + "\n")
         return result
 
 
+@functools.lru_cache(maxsize=None)
+def _load_suite(label):
+    """Import and introspect a test label once per process."""
+    tests = DiscoverRunner().load_tests_for_label(label, {})
+    return tuple(iter_test_cases(tests)) if tests is not None else ()
+
+
+# Signs that a TransactionTestCase really needs committed data: on-commit
+# hooks, or database access from other threads / async consumers
+_REAL_COMMIT_MARKERS = ('on_commit', 'Thread', 'WebsocketCommunicator', 'sync_to_async')
+
+
+def find_transaction_test_cases(module_labels):
+    """
+    Return (path, line, class name) for every class in the given test modules
+    that subclasses TransactionTestCase without needing real commits.
+    """
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    found = []
+    
+    for label in module_labels:
+        path = os.path.join(project_root, *label.split('.')) + '.py'
+        if not os.path.exists(path):
+            continue
+        
+        with open(path, encoding='utf-8') as f:
+            source = f.read()
+        try:
+            tree = ast.parse(source, filename=path)
+        except SyntaxError:
+            continue
+        
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.ClassDef):
+                continue
+            base_names = {
+                base.id if isinstance(base, ast.Name) else getattr(base, 'attr', None)
+                for base in node.bases
+            }
+            if 'TransactionTestCase' not in base_names:
+                continue
+            class_source = ast.get_source_segment(source, node)
+            if not any(marker in class_source for marker in _REAL_COMMIT_MARKERS):
+                found.append((path, node.lineno, node.name))
+    
+    return found
+
+
+class CachedDiscoverRunner(DiscoverRunner):
+    """Discover runner that reuses loaded test modules and the test database."""
+    
+    # TestCase (savepoint rollback) runs before TransactionTestCase (table
+    # flush) so flushed tables can't leak into tests that expect clean state
+    reorder_by = (TestCase, TransactionTestCase)
+    
+    # (runner, old_config) of the runner that created the shared test databases
+    _shared_databases = None
+    
+    # Database aliases the system checks have already passed for
+    _checked_databases = frozenset()
+    
+    def __init__(self, **kwargs):
+        kwargs.setdefault('keepdb', True)
+        super().__init__(**kwargs)
+    
+    def load_tests_for_label(self, label, discover_kwargs):
+        # A fresh suite is built around the cached cases because running a
+        # unittest suite empties it
+        return self.test_suite(_load_suite(label))
+    
+    @classmethod
+    def clear_cache(cls):
+        """Forget loaded test modules, e.g. after editing tests in-process."""
+        _load_suite.cache_clear()
+    
+    def run_checks(self, databases):
+        # System checks walk every installed app and model; the registry can't
+        # change between suites, so they only need to pass once per process
+        if not CachedDiscoverRunner._checked_databases.issuperset(databases):
+            super().run_checks(databases)
+            CachedDiscoverRunner._checked_databases |= frozenset(databases)
+    
+    def setup_databases(self, **kwargs):
+        # Create the schema once and hand the same databases to every later run
+        if CachedDiscoverRunner._shared_databases is None:
+            CachedDiscoverRunner._shared_databases = (self, super().setup_databases(**kwargs))
+        return CachedDiscoverRunner._shared_databases[1]
+    
+    def teardown_databases(self, old_config, **kwargs):
+        """Deferred to teardown_shared_databases() so later suites can reuse them."""
+    
+    @classmethod
+    def teardown_shared_databases(cls):
+        """Destroy the test databases created by the first run, if any."""
+        if cls._shared_databases is not None:
+            runner, old_config = cls._shared_databases
+            cls._shared_databases = None
+            DiscoverRunner.teardown_databases(runner, old_config)
+
+
+def _setup_django():
+    """Configure Django for the test settings unless it is set up already."""
+    import django
+    
+    if not settings.configured:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.misc.test_settings')
+    django.setup()
+
+
+def _run_batch_in_worker(batch, verbosity, fail_fast):
+    """Run a batch of suites as one Django run in a worker process."""
+    batch_name = ', '.join(batch)
+    runner = ComprehensiveTestRunner(fail_fast=fail_fast)
+    try:
+        runner.run_test_suite(batch_name, verbosity, labels=list(batch))
+    finally:
+        CachedDiscoverRunner.teardown_shared_databases()
+    return runner.results[batch_name]
+
+
 class ComprehensiveTestRunner:
     """Comprehensive test runner for all test suites."""
     
-    def __init__(self):
+    def __init__(self, batch_size=None, max_workers=None, fail_fast=None):
         self.test_suites = [
-            'tests.test_authentication',
-            'tests.test_game_mechanics', 
-            'tests.test_admin_panel',
-            'tests.test_wallet_system',
-            'tests.test_comprehensive_api',
-            'tests.test_integration',
-            'tests.test_core_functionality',
+            'tests.unit.test_authentication',
+            'tests.unit.test_game_mechanics', 
+            'tests.admin.test_admin_panel',
+            'tests.wallet.test_wallet_system',
+            'tests.integration.test_comprehensive_api',
+            'tests.integration.test_integration',
+            'tests.unit.test_core_functionality',
         ]
         
+        # Suites are grouped into batches so each worker process pays the
+        # Django setup and schema creation once per batch, not once per suite
+        self.batch_size = batch_size or int(os.environ.get('TEST_BATCH_SIZE', 3))
+        # Each worker process gets its own in-memory test database
+        self.max_workers = max_workers or int(
+            os.environ.get('TEST_WORKERS', min(os.cpu_count() or 1, 4))
+        )
+        
+        # Stop at the first failing test and skip the remaining suites
+        self.fail_fast = fail_fast if fail_fast is not None else os.environ.get('TEST_FAILFAST') == '1'
+        
         self.results = {}
+        self._test_runners = {}
+    
+    def get_test_runner(self, verbosity):
+        """Return the shared Django test runner for a verbosity level."""
+        key = (verbosity, self.fail_fast)
+        if key not in self._test_runners:
+            self._test_runners[key] = CachedDiscoverRunner(
+                verbosity=verbosity, interactive=False, failfast=self.fail_fast
+            )
+        return self._test_runners[key]
     
-    def run_test_suite(self, suite_name, verbosity=2):
-        """Run a specific test suite."""
+    def _batches(self):
+        """Yield the suites in groups of batch_size."""
+        for i in range(0, len(self.test_suites), self.batch_size):
+            yield self.test_suites[i:i + self.batch_size]
+    
+    def run_test_suite(self, suite_name, verbosity=2, labels=None):
+        """Run a specific test suite, or several labels reported under one name."""
         print(f"\n{'='*70}")
-        print(f"\033[1m🧪 RUNNING {suite_name.upper()}\033[0m")
+        print(f"{BOLD}🧪 RUNNING {suite_name.upper()}{RESET}")
         print(f"{'='*70}")
         
-        # Capture output
-        old_stdout = sys.stdout
-        old_stderr = sys.stderr
-        
-        stdout_capture = StringIO()
-        stderr_capture = StringIO()
+        # Quiet runs discard stray prints from the suites; verbose runs show them live
+        sink = open(os.devnull, 'w') if verbosity < 2 else contextlib.nullcontext(sys.stdout)
         
         try:
             # Run the test
-            from django.test.utils import get_runner
-            TestRunner = get_runner(settings)
-            test_runner = TestRunner(verbosity=verbosity, interactive=False)
+            test_runner = self.get_test_runner(verbosity)
             
             start_time = time.time()
-            result = test_runner.run_tests([suite_name])
+            with sink as out, contextlib.redirect_stdout(out):
+                result = test_runner.run_tests(labels or [suite_name])
             end_time = time.time()
             
             # Store results
@@ -143,7 +339,7 @@ class ComprehensiveTestRunner:
             return result == 0
             
         except Exception as e:
-            print(f"\033[91mError running {suite_name}: {e}\033[0m")
+            print(f"{RED}Error running {suite_name}: {e}{RESET}")
             self.results[suite_name] = {
                 'passed': False,
                 'duration': 0,
@@ -151,27 +347,51 @@ class ComprehensiveTestRunner:
                 'error': str(e)
             }
             return False
-        
-        finally:
-            sys.stdout = old_stdout
-            sys.stderr = old_stderr
     
-    def run_all_tests(self, verbosity=2):
+    def run_all_tests(self, verbosity=2, fail_fast=None):
         """Run all test suites."""
-        print("\033[1m" + "="*70)
+        if fail_fast is not None:
+            self.fail_fast = fail_fast
+        
+        print(BOLD + "="*70)
         print("🚀 STARTING COMPREHENSIVE TEST SUITE")
-        print("="*70 + "\033[0m")
+        print("="*70 + RESET)
         
         total_start_time = time.time()
         
-        # Run each test suite
-        for suite in self.test_suites:
-            success = self.run_test_suite(suite, verbosity)
-            
-            if success:
-                print(f"\033[92m✓ {suite} PASSED\033[0m")
-            else:
-                print(f"\033[91m✗ {suite} FAILED\033[0m")
+        for path, line, class_name in find_transaction_test_cases(self.test_suites):
+            print(f"{YELLOW}⚠ {os.path.relpath(path)}:{line} {class_name} subclasses TransactionTestCase "
+                  f"but never needs committed data; TestCase rolls back much faster{RESET}")
+        
+        # Run the suite batches concurrently; a worker picks up the next batch as soon as it frees
+        try:
+            # Spawned and forkserver workers never run the __main__ block, so set Django up in each
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_setup_django) as executor:
+                futures = {
+                    ', '.join(batch): executor.submit(_run_batch_in_worker, batch, verbosity, self.fail_fast)
+                    for batch in self._batches()
+                }
+                
+                for suite, future in futures.items():
+                    try:
+                        self.results[suite] = future.result()
+                    except Exception as e:
+                        self.results[suite] = {
+                            'passed': False,
+                            'duration': 0,
+                            'exit_code': 1,
+                            'error': str(e)
+                        }
+                    
+                    if self.results[suite]['passed']:
+                        print(f"{GREEN}✓ {suite} PASSED{RESET}")
+                    else:
+                        print(f"{RED}✗ {suite} FAILED{RESET}")
+                        if self.fail_fast:
+                            executor.shutdown(wait=False, cancel_futures=True)
+                            break
+        finally:
+            CachedDiscoverRunner.teardown_shared_databases()
         
         total_end_time = time.time()
         total_duration = total_end_time - total_start_time
@@ -184,122 +404,137 @@ class ComprehensiveTestRunner:
     
     def print_final_summary(self, total_duration):
         """Print final test summary."""
-        print("\n" + "="*70)
-        print("\033[1m📊 FINAL TEST REPORT\033[0m")
-        print("="*70)
+        lines = []
+        append = lines.append
+        append("\n" + "="*70)
+        append(f"{BOLD}📊 FINAL TEST REPORT{RESET}")
+        append("="*70)
         
         passed_suites = sum(1 for r in self.results.values() if r['passed'])
         total_suites = len(self.results)
         
-        print(f"Total Test Suites: {total_suites}")
-        print(f"\033[92mPassed: {passed_suites}\033[0m")
-        print(f"\033[91mFailed: {total_suites - passed_suites}\033[0m")
-        print(f"Total Duration: {total_duration:.2f} seconds")
+        append(f"Total Test Suites: {total_suites}")
+        append(f"{GREEN}Passed: {passed_suites}{RESET}")
+        append(f"{RED}Failed: {total_suites - passed_suites}{RESET}")
+        append(f"Total Duration: {total_duration:.2f} seconds")
         
         # Detailed results
-        print(f"\n\033[1mDetailed Results:\033[0m")
+        append(f"\n{BOLD}Detailed Results:{RESET}")
         for suite, result in self.results.items():
-            status = "\033[92m✓ PASS\033[0m" if result['passed'] else "\033[91m✗ FAIL\033[0m"
-            duration = result['duration']
-            print(f"  {suite:<40} {status} ({duration:.2f}s)")
+            status = PASS_MARK if result['passed'] else FAIL_MARK
+            append(f"  {suite:<40} {status} ({result['duration']:.2f}s)")
         
         # Overall result
         if passed_suites == total_suites:
-            print(f"\n\033[92m🎉 ALL TEST SUITES PASSED! 🎉\033[0m")
-            print(f"\033[92mYour Color Prediction Game is ready for production! 🚀\033[0m")
+            append(f"\n{GREEN}🎉 ALL TEST SUITES PASSED! 🎉{RESET}")
+            append(f"{GREEN}Your Color Prediction Game is ready for production! 🚀{RESET}")
         else:
-            print(f"\n\033[91m❌ {total_suites - passed_suites} TEST SUITE(S) FAILED\033[0m")
-            print(f"\033[93mPlease review the failed tests before deployment.\033[0m")
+            append(f"\n{RED}❌ {total_suites - passed_suites} TEST SUITE(S) FAILED{RESET}")
+            append(f"{YELLOW}Please review the failed tests before deployment.{RESET}")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
     
     def run_specific_tests(self, test_patterns, verbosity=2):
         """Run specific test patterns."""
-        print(f"\033[1m🎯 RUNNING SPECIFIC TESTS: {', '.join(test_patterns)}\033[0m")
+        print(f"{BOLD}🎯 RUNNING SPECIFIC TESTS: {', '.join(test_patterns)}{RESET}")
         
-        for pattern in test_patterns:
-            self.run_test_suite(pattern, verbosity)
+        try:
+            for pattern in test_patterns:
+                if not self.run_test_suite(pattern, verbosity) and self.fail_fast:
+                    break
+        finally:
+            CachedDiscoverRunner.teardown_shared_databases()
         
         # Print summary for specific tests
         passed = sum(1 for r in self.results.values() if r['passed'])
         total = len(self.results)
         
         if passed == total:
-            print(f"\n\033[92m✓ All specified tests passed!\033[0m")
+            print(f"\n{GREEN}✓ All specified tests passed!{RESET}")
         else:
-            print(f"\n\033[91m✗ {total - passed} test(s) failed\033[0m")
+            print(f"\n{RED}✗ {total - passed} test(s) failed{RESET}")
+
+
+@functools.lru_cache(maxsize=None)
+def _runner(fail_fast=None):
+    """Shared runner, so helpers called in sequence reuse its Django test runners."""
+    return ComprehensiveTestRunner(fail_fast=fail_fast)
 
 
-def run_quick_tests():
+def run_quick_tests(fail_fast=None):
     """Run a quick subset of critical tests."""
-    runner = ComprehensiveTestRunner()
+    runner = _runner(fail_fast)
+    runner.results.clear()
     
     quick_tests = [
-        'tests.test_authentication.UserLoginTests',
-        'tests.test_game_mechanics.BettingSystemTests',
-        'tests.test_wallet_system.WalletServiceTests',
-        'tests.test_comprehensive_api.AuthenticatedAPITests',
+        'tests.unit.test_authentication.UserLoginTests',
+        'tests.unit.test_game_mechanics.BettingSystemTests',
+        'tests.wallet.test_wallet_system.WalletServiceTests',
+        'tests.integration.test_comprehensive_api.AuthenticatedAPITests',
     ]
     
-    print("\033[1m⚡ RUNNING QUICK TEST SUITE\033[0m")
+    print(f"{BOLD}⚡ RUNNING QUICK TEST SUITE{RESET}")
     runner.run_specific_tests(quick_tests, verbosity=1)
 
 
-def run_security_tests():
+def run_security_tests(fail_fast=None):
     """Run security-focused tests."""
-    runner = ComprehensiveTestRunner()
+    runner = _runner(fail_fast)
+    runner.results.clear()
     
     security_tests = [
-        'tests.test_authentication.SecurityValidationTests',
-        'tests.test_comprehensive_api.APISecurityTests',
-        'tests.test_wallet_system.FraudDetectionTests',
+        'tests.unit.test_authentication.SecurityValidationTests',
+        'tests.integration.test_comprehensive_api.APISecurityTests',
+        'tests.wallet.test_wallet_system.FraudDetectionTests',
     ]
     
-    print("\033[1m🔒 RUNNING SECURITY TEST SUITE\033[0m")
+    print(f"{BOLD}🔒 RUNNING SECURITY TEST SUITE{RESET}")
     runner.run_specific_tests(security_tests, verbosity=2)
 
 
-def run_performance_tests():
+def run_performance_tests(fail_fast=None):
     """Run performance-focused tests."""
-    runner = ComprehensiveTestRunner()
+    runner = _runner(fail_fast)
+    runner.results.clear()
     
     performance_tests = [
-        'tests.test_comprehensive_api.PerformanceTests',
-        'tests.test_integration.SystemStressTest',
-        'tests.test_game_mechanics.RealTimeUpdatesTests',
+        'tests.integration.test_comprehensive_api.PerformanceTests',
+        'tests.integration.test_integration.SystemStressTest',
+        'tests.unit.test_game_mechanics.RealTimeUpdatesTests',
     ]
     
-    print("\033[1m🚀 RUNNING PERFORMANCE TEST SUITE\033[0m")
+    print(f"{BOLD}🚀 RUNNING PERFORMANCE TEST SUITE{RESET}")
     runner.run_specific_tests(performance_tests, verbosity=2)
 
 
 if __name__ == '__main__':
-    import django
-    from django.conf import settings
-    
     # Configure Django settings for testing
-    if not settings.configured:
-        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.test_settings')
-        django.setup()
+    _setup_django()
     
     # Parse command line arguments
-    if len(sys.argv) > 1:
-        command = sys.argv[1]
+    fail_fast_flags = {'--fail-fast', '-x'}
+    args = [arg for arg in sys.argv[1:] if arg not in fail_fast_flags]
+    fail_fast = True if len(args) < len(sys.argv) - 1 else None
+    
+    if args:
+        command = args[0]
         
         if command == 'quick':
-            run_quick_tests()
+            run_quick_tests(fail_fast)
         elif command == 'security':
-            run_security_tests()
+            run_security_tests(fail_fast)
         elif command == 'performance':
-            run_performance_tests()
+            run_performance_tests(fail_fast)
         elif command == 'all':
-            runner = ComprehensiveTestRunner()
+            runner = _runner(fail_fast)
             success = runner.run_all_tests()
             sys.exit(0 if success else 1)
         else:
             # Run specific test pattern
-            runner = ComprehensiveTestRunner()
+            runner = _runner(fail_fast)
             runner.run_specific_tests([command])
     else:
         # Run all tests by default
-        runner = ComprehensiveTestRunner()
+        runner = _runner(fail_fast)
         success = runner.run_all_tests()
         sys.exit(0 if success else 1)
@@ -7,6 +7,9 @@ from server.settings import *
 import tempfile
 import os
 
+from django.contrib.auth.hashers import BasePasswordHasher
+from django.utils.crypto import constant_time_compare
+
 # Test Database Configuration
 DATABASES = {
     'default': {
@@ -42,17 +45,37 @@ CSRF_COOKIE_SECURE = False
 # Email backend for testing
 EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
 
-# Cache configuration for testing
+# Send emails inline; queued tasks (when Celery is installed) run eagerly
+EMAIL_ASYNC_DELIVERY = False
+CELERY_TASK_ALWAYS_EAGER = True
+CELERY_TASK_EAGER_PROPAGATES = True
+
+# Cache configuration for testing. Application caching is a no-op by
+# default; tests that assert on cached state (rate limits, lockouts) opt
+# back in with @override_settings(CACHES=REAL_CACHE).
+SESSION_CACHE = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'test-sessions',
+}
+
 CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+    'sessions': SESSION_CACHE,
+}
+
+REAL_CACHE = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'test-cache',
-    }
+    },
+    'sessions': SESSION_CACHE,
 }
 
 # Session configuration for testing
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
-SESSION_CACHE_ALIAS = 'default'
+SESSION_CACHE_ALIAS = 'sessions'
 
 # Disable rate limiting for tests
 API_RATE_LIMIT_PER_MINUTE = 10000
@@ -104,8 +127,32 @@ BREVO_SMTP_KEY = 'test_smtp_key'
 NOTIFICATION_EMAIL_ENABLED = False
 
 # Password hashers for faster tests
+class PlainPasswordHasher(BasePasswordHasher):
+    """Unsalted, unhashed storage - only ever referenced from this module."""
+    algorithm = 'plain'
+
+    def salt(self):
+        return ''
+
+    def encode(self, password, salt):
+        return f'{self.algorithm}${password}'
+
+    def decode(self, encoded):
+        algorithm, password = encoded.split('$', 1)
+        return {'algorithm': algorithm, 'hash': password, 'salt': ''}
+
+    def verify(self, password, encoded):
+        return constant_time_compare(encoded, self.encode(password, ''))
+
+    def safe_summary(self, encoded):
+        return {'algorithm': self.algorithm}
+
+    def harden_runtime(self, password, encoded):
+        pass
+
+
 PASSWORD_HASHERS = [
-    'django.contrib.auth.hashers.MD5PasswordHasher',
+    'tests.misc.test_settings.PlainPasswordHasher',
 ]
 
 # Disable whitenoise for tests
@@ -122,6 +169,16 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
 ]
 
+# Leaner stack for JSON API suites, which never render messages and are not
+# CSRF-checked by the test client (apply with @override_settings)
+MIDDLEWARE_API = [
+    m for m in MIDDLEWARE
+    if m not in {
+        'django.middleware.csrf.CsrfViewMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+    }
+]
+
 # Channels configuration for testing
 CHANNEL_LAYERS = {
     'default': {
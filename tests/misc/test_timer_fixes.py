@@ -5,13 +5,59 @@ Simulates timer behavior and checks for stuck timer issues
 """
 
 import asyncio
+import math
 import time
 import logging
+from unittest.mock import patch
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Real seconds per simulated timer second; the timer logic doesn't depend on wall time
+TIMER_TICK = 0.001
+
+# Stuck-timer reasons, indexed by the codes stored in STUCK_TABLE
+STUCK_REASONS = (
+    None,
+    "No updates for >3 seconds",
+    "Stuck at 1 second for >2 seconds",
+)
+
+# Every non-betting phase behaves the same for stuck detection
+PHASE_CODE = {'betting': 0, 'result': 1}
+
+
+def _stuck_reason_code(phase_code, time_remaining, update_bucket):
+    """
+    Evaluate the stuck-timer predicates for one key. update_bucket k covers
+    time_since_update in (k/2, (k+1)/2], so both thresholds fall on bucket edges.
+    """
+    reason = 0
+    
+    # General stuck timer: >3s without updates while betting
+    if update_bucket >= 6 and phase_code == PHASE_CODE['betting'] and time_remaining > 0:
+        reason = 1
+    
+    # Stuck at 1 second for >2s
+    if time_remaining == 1 and update_bucket >= 4:
+        reason = 2
+    
+    return reason
+
+
+def _stuck_key(phase, time_remaining, time_since_update):
+    """Pack a timer state into a STUCK_TABLE index."""
+    update_bucket = min(max(math.ceil(time_since_update * 2) - 1, 0), 15)
+    return (PHASE_CODE.get(phase, PHASE_CODE['result']) << 8) | (min(time_remaining, 15) << 4) | update_bucket
+
+
+# Precomputed over the whole key domain so detection is a single table read
+STUCK_TABLE = bytes(
+    _stuck_reason_code(key >> 8, (key >> 4) & 15, key & 15)
+    for key in range(len(PHASE_CODE) << 8)
+)
+
 class MockTimerTest:
     """Mock timer test to simulate the fixed timer behavior"""
     
@@ -21,11 +67,13 @@ class MockTimerTest:
         self.cancelled = False
         self.heartbeat_interval = 2
         
-    async def simulate_round_timer(self):
-        """Simulate the improved round timer"""
+    async def simulate_round_timer(self, tick=1.0):
+        """Simulate the improved round timer, with `tick` real seconds per timer second"""
         try:
-            start_time = asyncio.get_event_loop().time()
-            last_heartbeat = 0
+            loop = asyncio.get_running_loop()
+            start_time = loop.time()
+            # Each remaining second is visited once, so no dedup is needed
+            heartbeats = frozenset(range(self.heartbeat_interval, 41, self.heartbeat_interval))
             
             print("🕐 Starting timer simulation...")
             print(f"⏱️ Initial time: {self.time_remaining} seconds")
@@ -42,14 +90,13 @@ class MockTimerTest:
                 print(f"⏰ Timer update: {remaining}s (phase: {self.phase})")
                 
                 # Simulate heartbeat
-                if remaining % self.heartbeat_interval == 0 and remaining != last_heartbeat:
+                if remaining in heartbeats:
                     print(f"💓 Heartbeat: {remaining}s")
-                    last_heartbeat = remaining
                 
                 # More precise timing calculation
-                elapsed = asyncio.get_event_loop().time() - start_time
-                expected_elapsed = (40 - remaining + 1)
-                sleep_duration = max(0.1, expected_elapsed - elapsed)
+                elapsed = loop.time() - start_time
+                expected_elapsed = (40 - remaining + 1) * tick
+                sleep_duration = max(0.1 * tick, expected_elapsed - elapsed)
                 
                 await asyncio.sleep(sleep_duration)
             
@@ -60,7 +107,7 @@ class MockTimerTest:
             print(f"⏰ Final timer update: 0s (phase: {self.phase})")
             
             # Small delay before results
-            await asyncio.sleep(0.5)
+            await asyncio.sleep(0.5 * tick)
             print("📊 Calculating results...")
             
             return True
@@ -77,22 +124,30 @@ def test_timer_precision():
     print("\n🧪 Testing Timer Precision")
     print("=" * 50)
     
-    start_time = time.time()
+    # Drive the ticks from a virtual monotonic clock so the test checks the
+    # drift bookkeeping without sleeping for ten seconds of wall time
+    clock = [time.perf_counter()]
+    
+    def fake_sleep(seconds):
+        clock[0] += seconds
+    
+    start_time = clock[0]
     expected_times = []
     actual_times = []
     
     # Simulate 10 timer ticks
-    for i in range(10):
-        expected_time = start_time + i
-        actual_time = time.time()
-        
-        expected_times.append(expected_time)
-        actual_times.append(actual_time)
-        
-        drift = actual_time - expected_time
-        print(f"Tick {i+1}: Expected {expected_time:.3f}, Actual {actual_time:.3f}, Drift: {drift:.3f}s")
-        
-        time.sleep(1)
+    with patch('time.sleep', side_effect=fake_sleep):
+        for i in range(10):
+            expected_time = start_time + i
+            actual_time = clock[0]
+            
+            expected_times.append(expected_time)
+            actual_times.append(actual_time)
+            
+            drift = actual_time - expected_time
+            print(f"Tick {i+1}: Expected {expected_time:.3f}, Actual {actual_time:.3f}, Drift: {drift:.3f}s")
+            
+            time.sleep(1)
     
     # Calculate average drift
     total_drift = sum(actual_times[i] - expected_times[i] for i in range(10))
@@ -108,42 +163,48 @@ def test_stuck_timer_detection():
     print("\n🔍 Testing Stuck Timer Detection")
     print("=" * 50)
     
+    # One clock snapshot; every state is measured against the same instant
+    snap = time.monotonic_ns()
+    
     # Simulate timer states
     timer_states = [
-        {'time': 5, 'last_update': time.time() - 1, 'phase': 'betting'},  # Normal
-        {'time': 1, 'last_update': time.time() - 3, 'phase': 'betting'},  # Stuck at 1
-        {'time': 10, 'last_update': time.time() - 5, 'phase': 'betting'}, # No updates
-        {'time': 0, 'last_update': time.time() - 1, 'phase': 'result'},   # Normal result
+        {'time': 5, 'last_update_ns': snap - 1_000_000_000, 'phase': 'betting'},  # Normal
+        {'time': 1, 'last_update_ns': snap - 3_000_000_000, 'phase': 'betting'},  # Stuck at 1
+        {'time': 10, 'last_update_ns': snap - 5_000_000_000, 'phase': 'betting'}, # No updates
+        {'time': 0, 'last_update_ns': snap - 1_000_000_000, 'phase': 'result'},   # Normal result
     ]
     
     for i, state in enumerate(timer_states, 1):
+        time_since_update = (snap - state['last_update_ns']) / 1e9
+        
         print(f"\nTest case {i}:")
         print(f"  Time remaining: {state['time']}s")
-        print(f"  Last update: {time.time() - state['last_update']:.1f}s ago")
+        print(f"  Last update: {time_since_update:.1f}s ago")
         print(f"  Phase: {state['phase']}")
         
         # Check for stuck conditions
-        now = time.time()
-        time_since_update = now - state['last_update']
-        
-        is_stuck = False
-        reason = ""
-        
-        # Check for general stuck timer
-        if time_since_update > 3 and state['phase'] == 'betting' and state['time'] > 0:
-            is_stuck = True
-            reason = "No updates for >3 seconds"
-        
-        # Check for stuck at 1 second
-        if state['time'] == 1 and time_since_update > 2:
-            is_stuck = True
-            reason = "Stuck at 1 second for >2 seconds"
+        reason = STUCK_REASONS[STUCK_TABLE[_stuck_key(state['phase'], state['time'], time_since_update)]]
+        is_stuck = reason is not None
         
         print(f"  Status: {'🚨 STUCK' if is_stuck else '✅ Normal'}")
         if is_stuck:
             print(f"  Reason: {reason}")
             print(f"  Action: Force transition to result phase")
 
+def test_stuck_table_matches_predicates():
+    """The precomputed table agrees with the direct stuck-timer checks"""
+    for phase in ('betting', 'result'):
+        for time_remaining in range(0, 41):
+            for time_since_update in (0, 0.4, 1, 1.9, 2, 2.01, 2.5, 3, 3.01, 5, 60):
+                expected = None
+                if time_since_update > 3 and phase == 'betting' and time_remaining > 0:
+                    expected = "No updates for >3 seconds"
+                if time_remaining == 1 and time_since_update > 2:
+                    expected = "Stuck at 1 second for >2 seconds"
+                
+                key = _stuck_key(phase, time_remaining, time_since_update)
+                assert STUCK_REASONS[STUCK_TABLE[key]] == expected, (phase, time_remaining, time_since_update)
+
 async def test_concurrent_timers():
     """Test multiple timer tasks to check for race conditions"""
     print("\n🏃 Testing Concurrent Timer Tasks")
@@ -154,33 +215,26 @@ async def test_concurrent_timers():
             print(f"Timer {timer_id}: Starting")
             for i in range(duration, 0, -1):
                 print(f"Timer {timer_id}: {i}s")
-                await asyncio.sleep(1)
+                await asyncio.sleep(TIMER_TICK)
             print(f"Timer {timer_id}: Completed")
             return timer_id
         except asyncio.CancelledError:
             print(f"Timer {timer_id}: Cancelled")
             raise
     
-    # Start multiple timers
-    tasks = []
-    for i in range(3):
-        task = asyncio.create_task(mock_timer(i+1))
-        tasks.append(task)
-    
-    # Cancel one timer after 2 seconds
-    await asyncio.sleep(2)
-    print("🛑 Cancelling timer 2...")
-    tasks[1].cancel()
-    
-    # Wait for all tasks to complete or be cancelled
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    # Start multiple timers; the group waits for all of them to complete or be cancelled
+    async with asyncio.TaskGroup() as tg:
+        tasks = [tg.create_task(mock_timer(i+1)) for i in range(3)]
+        
+        # Cancel one timer mid-way through its third second
+        await asyncio.sleep(2.5 * TIMER_TICK)
+        print("🛑 Cancelling timer 2...")
+        tasks[1].cancel()
     
     print(f"\n📊 Concurrent Timer Results:")
-    for i, result in enumerate(results):
-        if isinstance(result, asyncio.CancelledError):
+    for i, task in enumerate(tasks):
+        if task.cancelled():
             print(f"   Timer {i+1}: Cancelled ✅")
-        elif isinstance(result, Exception):
-            print(f"   Timer {i+1}: Error - {result}")
         else:
             print(f"   Timer {i+1}: Completed ✅")
 
@@ -194,7 +248,7 @@ async def main():
     print("-" * 30)
     
     timer_test = MockTimerTest()
-    success = await timer_test.simulate_round_timer()
+    success = await timer_test.simulate_round_timer(tick=TIMER_TICK)
     print(f"Result: {'✅ Success' if success else '❌ Failed'}")
     
     # Test 2: Timer precision
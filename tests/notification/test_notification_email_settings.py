@@ -1,37 +1,33 @@
-#!/usr/bin/env python
 """
 Test Notification Email Settings - Verify that emails are only sent for OTP and password reset
 """
-import os
-import sys
-import django
+from unittest.mock import patch
 
-# Setup Django
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'server.settings')
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
-# Add SITE_URL for testing
-os.environ.setdefault('SITE_URL', 'http://localhost:8000')
+from polling.brevo_email_service import BrevoEmailService
+from polling.models import Player, NotificationType
+from polling.notification_service import (
+    NotificationService, notify_account_activity, notify_game_result, notify_wallet_transaction
+)
+from polling.otp_utils import OTPService
+from tests.misc.test_settings import REAL_CACHE
+from tests.utils import setup_test_notification_types
 
-django.setup()
+pytestmark = pytest.mark.django_db
 
-# Add SITE_URL to settings
-from django.conf import settings
-if not hasattr(settings, 'SITE_URL'):
-    setattr(settings, 'SITE_URL', 'http://localhost:8000')
 
-from polling.models import Player, NotificationType
-from polling.notification_service import NotificationService, notify_wallet_transaction, notify_game_result
-from polling.email_service import send_otp_email, send_password_reset_email
-from django.utils import timezone
-from django.core import mail
-from django.test.utils import override_settings
-import uuid
-
-def test_notification_types():
-    """Test that notification types are configured correctly"""
-    print("🔍 Testing notification type settings...")
+@pytest.fixture(autouse=True)
+def notification_types(db):
+    """Notification types the notify_* helpers look up by name."""
+    setup_test_notification_types()
+
 
+def test_notification_types(django_assert_num_queries):
+    """Test that notification types are configured correctly"""
     # Email should be enabled only for these types
     email_enabled_types = [
         'password_changed',
@@ -40,213 +36,144 @@ def test_notification_types():
         'email_verified'
     ]
 
-    # Get all notification types
-    all_types = NotificationType.objects.all()
+    # Get all notification types in one query
+    with django_assert_num_queries(1):
+        all_types = list(NotificationType.objects.all())
 
-    print("\nNotification Types:")
+    # Critical types must keep email delivery; the rest are gated by the service
     for nt in all_types:
-        email_status = "✅" if nt.email_enabled else "❌"
-        app_status = "✅" if nt.in_app_enabled else "❌"
-
-        expected_email = nt.name in email_enabled_types
-        correct = nt.email_enabled == expected_email
-
-        status = "✓" if correct else "✗"
-
-        print(f"{status} {nt.name}: Email {email_status}, In-App {app_status}")
-
-    # Count types with email enabled
-    email_enabled_count = sum(1 for nt in all_types if nt.email_enabled)
-
-    print(f"\nEmail enabled for {email_enabled_count} notification types")
-    print(f"In-app enabled for {sum(1 for nt in all_types if nt.in_app_enabled)} notification types")
-
-    return True
-
-def test_wallet_notification_no_email():
-    """Test that wallet notifications don't send emails"""
-    print("\n💰 Testing wallet notifications (should NOT send email)...")
-    
-    # Create a test player with unique email
-    unique_id = uuid.uuid4().hex[:8]
-    test_player = Player.objects.create(
-        username=f"test_wallet_{unique_id}",
-        email=f"test_{unique_id}@example.com",
-        email_verified=True
-    )
-    
-    # Clear the test outbox
-    mail.outbox = []
-    
-    # Send a wallet notification
-    with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
-        notify_wallet_transaction(
-            user=test_player,
-            transaction_type='deposit',
-            amount=100,
-            new_balance=100
-        )
-    
-    # Check if any emails were sent
-    emails_sent = len(mail.outbox)
-    
-    print(f"Emails sent for wallet notification: {emails_sent}")
-    
-    if emails_sent == 0:
-        print("✅ No emails sent for wallet notification (correct)")
-        return True
-    else:
-        print("❌ Emails were sent for wallet notification (incorrect)")
-        return False
-
-def test_game_result_notification_no_email():
-    """Test that game result notifications don't send emails"""
-    print("\n🎮 Testing game result notifications (should NOT send email)...")
-    
-    # Create a test player with unique email
-    unique_id = uuid.uuid4().hex[:8]
-    test_player = Player.objects.create(
-        username=f"test_game_{unique_id}",
-        email=f"test_game_{unique_id}@example.com",
-        email_verified=True
-    )
-    
-    # Mock game round
-    class MockGameRound:
-        def __init__(self):
-            self.id = 12345
-            self.result_color = 'green'
-    
-    # Clear the test outbox
-    mail.outbox = []
-    
-    # Send a game result notification
-    with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
-        notify_game_result(
-            user=test_player,
-            game_round=MockGameRound(),
-            bet_result='win',
-            amount=50
-        )
-    
-    # Check if any emails were sent
-    emails_sent = len(mail.outbox)
-    
-    print(f"Emails sent for game result notification: {emails_sent}")
-    
-    if emails_sent == 0:
-        print("✅ No emails sent for game result notification (correct)")
-        return True
-    else:
-        print("❌ Emails were sent for game result notification (incorrect)")
-        return False
-
-def test_otp_email_sends():
+        if nt.name in email_enabled_types:
+            assert nt.email_enabled, f"{nt.name} must have email enabled"
+
+
+class MockGameRound:
+    """Stand-in for a finished GameRound"""
+    id = 12345
+    result_color = 'green'
+
+
+# Notifications that must stay in-app only, keyed by case name
+SUPPRESSED_NOTIFICATIONS = {
+    'wallet': lambda user: notify_wallet_transaction(
+        user=user, transaction_type='deposit', amount=100, new_balance=100
+    ),
+    'game_result': lambda user: notify_game_result(
+        user=user, game_round=MockGameRound(), bet_result='win', amount=50
+    ),
+    'account_activity': lambda user: notify_account_activity(
+        user=user, activity_type='login', details='Logged in from a new session'
+    ),
+}
+
+
+@pytest.fixture(scope='module')
+def notification_players(django_db_setup, django_db_blocker):
+    """One verified player per suppressed notification case, inserted in one query"""
+    with django_db_blocker.unblock():
+        players = Player.objects.bulk_create([
+            Player(username=f"notify_{case}", email=f"notify_{case}@example.com", email_verified=True)
+            for case in SUPPRESSED_NOTIFICATIONS
+        ])
+    yield dict(zip(SUPPRESSED_NOTIFICATIONS, players))
+    with django_db_blocker.unblock():
+        Player.objects.filter(pk__in=[p.pk for p in players]).delete()
+
+
+@pytest.fixture
+def player(request, notification_players):
+    return notification_players[request.param]
+
+
+@pytest.mark.parametrize(
+    'player, case',
+    [(case, case) for case in SUPPRESSED_NOTIFICATIONS],
+    indirect=['player'],
+    ids=list(SUPPRESSED_NOTIFICATIONS),
+)
+def test_notification_sends_no_email(player, case, mailoutbox, django_assert_max_num_queries):
+    """Test that wallet, game result and account notifications don't send emails"""
+    # Cold path: type lookup, preference get + create, insert, cleanup count, delivery update
+    with django_assert_max_num_queries(6):
+        notification = SUPPRESSED_NOTIFICATIONS[case](player)
+
+    assert notification is not None
+    assert not mailoutbox, f"Emails were sent for {case} notification"
+
+
+def test_otp_email_sends(smtp_credentials, mailoutbox, django_assert_num_queries):
     """Test that OTP emails are sent"""
-    print("\n🔐 Testing OTP emails (should send email)...")
-    
-    # Clear the test outbox
-    mail.outbox = []
-    
-    # Send an OTP email
-    with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
-        result = send_otp_email(
+    # Send an OTP email; rendering and sending must not touch the database
+    with django_assert_num_queries(0):
+        result = BrevoEmailService.send_otp_email(
             email="test3@example.com",
             otp_code="123456",
             purpose="verification"
         )
-    
-    # Check if any emails were sent
-    emails_sent = len(mail.outbox)
-    
-    print(f"Emails sent for OTP: {emails_sent}")
-    
-    if emails_sent > 0:
-        print("✅ Email sent for OTP (correct)")
-        print(f"  Subject: {mail.outbox[0].subject}")
-        print(f"  To: {mail.outbox[0].to}")
-        return True
-    else:
-        print("❌ No email sent for OTP (incorrect)")
-        return False
-
-def test_password_reset_email_sends():
+
+    assert result
+    assert mailoutbox, "expected at least one email"
+    assert mailoutbox[0].to == ["test3@example.com"]
+
+
+def test_password_reset_email_sends(smtp_credentials, mailoutbox, django_assert_num_queries):
     """Test that password reset emails are sent"""
-    print("\n🔑 Testing password reset emails (should send email)...")
-    
-    # Clear the test outbox
-    mail.outbox = []
-    
     # Send a password reset email
-    with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
-        result = send_password_reset_email(
+    with django_assert_num_queries(0):
+        result = BrevoEmailService.send_password_reset_email(
             email="test4@example.com",
-            reset_token="abcdef123456"
+            otp_code="654321"
         )
-    
-    # Check if any emails were sent
-    emails_sent = len(mail.outbox)
-    
-    print(f"Emails sent for password reset: {emails_sent}")
-    
-    if emails_sent > 0:
-        print("✅ Email sent for password reset (correct)")
-        print(f"  Subject: {mail.outbox[0].subject}")
-        print(f"  To: {mail.outbox[0].to}")
-        return True
-    else:
-        print("❌ No email sent for password reset (incorrect)")
-        return False
-
-def main():
-    """Main test function"""
-    print("🧪 Testing Notification Email Settings")
-    print("=" * 50)
-    print("VERIFYING EMAILS ONLY SENT FOR OTP AND PASSWORD RESET")
-    print("=" * 50)
-    
-    tests = [
-        test_notification_types,
-        test_wallet_notification_no_email,
-        test_game_result_notification_no_email,
-        test_otp_email_sends,
-        test_password_reset_email_sends
+
+    assert result
+    assert mailoutbox, "expected at least one email"
+    assert mailoutbox[0].to == ["test4@example.com"]
+
+
+def test_otp_email_queued_when_async(settings, mailoutbox):
+    """Test that OTP emails are handed to Celery when async delivery is on"""
+    settings.EMAIL_ASYNC_DELIVERY = True
+
+    with patch('polling.tasks.CELERY_AVAILABLE', True), \
+            patch('polling.tasks.send_otp_email_task') as task:
+        success, message = OTPService.send_otp_email("test5@example.com", "112233")
+
+    assert success
+    task.delay.assert_called_once_with("test5@example.com", "112233", "verification")
+    assert not mailoutbox
+
+
+@pytest.fixture
+def real_cache(settings):
+    """Enable a real cache for the test and empty it afterwards"""
+    settings.CACHES = REAL_CACHE
+    yield
+    cache.clear()
+
+
+def test_notification_type_lookup_is_cached(shared_player, real_cache):
+    """Test that repeat notifications don't look the notification type up again"""
+    notify = SUPPRESSED_NOTIFICATIONS['wallet']
+    notify(shared_player)  # warms the type cache and creates the preference
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert notify(shared_player) is not None
+
+    type_queries = [q['sql'] for q in ctx.captured_queries if 'FROM "polling_notificationtype"' in q['sql']]
+    assert not type_queries, type_queries
+    assert len(ctx) <= 4, [q['sql'] for q in ctx.captured_queries]
+
+
+def test_create_many_inserts_in_one_query(shared_player, mailoutbox):
+    """Test that batched notifications share one INSERT and still skip email"""
+    specs = [
+        {'user': shared_player, 'notification_type_name': name, 'title': f"Batch {name}", 'message': "Batched"}
+        for name in ('wallet_transaction', 'game_result', 'account_activity')
     ]
-    
-    passed = 0
-    total = len(tests)
-    
-    for test in tests:
-        try:
-            if test():
-                passed += 1
-                print(f"✅ {test.__name__} PASSED\n")
-            else:
-                print(f"❌ {test.__name__} FAILED\n")
-        except Exception as e:
-            print(f"❌ {test.__name__} ERROR: {e}\n")
-            import traceback
-            traceback.print_exc()
-    
-    print(f"📊 Test Results: {passed}/{total} tests passed")
-    
-    if passed == total:
-        print("\n🎉 All tests passed!")
-        print("\n✅ Email Configuration:")
-        print("✅ Emails ONLY sent for OTP and password reset")
-        print("✅ No emails sent for wallet transactions")
-        print("✅ No emails sent for game results")
-        print("✅ In-app notifications working for all types")
-        
-        print(f"\n🎯 System Status:")
-        print(f"🟢 NOTIFICATION SYSTEM CONFIGURED CORRECTLY")
-        print(f"📱 In-app notifications active for all events")
-        print(f"📧 Emails only for critical authentication events")
-        print(f"🔒 OTP verification working via email")
-        print(f"🔑 Password reset working via email")
-        
-    else:
-        print(f"\n⚠️ {total - passed} tests failed. Check the notification configuration.")
-
-if __name__ == '__main__':
-    main()
+
+    with CaptureQueriesContext(connection) as ctx:
+        notifications = NotificationService().create_many(specs)
+
+    inserts = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "polling_notification"')]
+    assert len(notifications) == len(specs)
+    assert len(inserts) == 1, inserts
+    assert not mailoutbox
@@ -5,6 +5,7 @@ Run this to test if email sending works properly
 """
 
 import os
+import re
 import django
 from django.conf import settings
 
@@ -20,6 +21,65 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+SUBJECT = "🧪 Test Email - Color Prediction Game"
+
+HTML_MESSAGE = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>Test Email</title>
+    <style>
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .header { background: linear-gradient(45deg, #667eea, #764ba2); color: white; padding: 20px; border-radius: 10px; text-align: center; }
+        .content { padding: 20px; background: #f9f9f9; border-radius: 10px; margin-top: 20px; }
+        .success { color: #059669; font-weight: bold; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>🎮 Color Prediction Game</h1>
+            <h2>Email Configuration Test</h2>
+        </div>
+        <div class="content">
+            <p>Hello!</p>
+            <p class="success">✅ Congratulations! Your Brevo SMTP configuration is working correctly.</p>
+            <p>This test email confirms that:</p>
+            <ul>
+                <li>📧 Brevo SMTP connection is successful</li>
+                <li>🔐 SMTP key authentication is working</li>
+                <li>📨 Email delivery is functioning properly</li>
+                <li>🎨 HTML email formatting is supported</li>
+            </ul>
+            <p>Your OTP verification system is now ready to send verification codes to users!</p>
+            <hr>
+            <p><small>This is an automated test email from Color Prediction Game.</small></p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+PLAIN_MESSAGE = """
+Color Prediction Game - Email Configuration Test
+
+Congratulations! Your Brevo SMTP configuration is working correctly.
+
+This test email confirms that:
+- Brevo SMTP connection is successful
+- SMTP key authentication is working
+- Email delivery is functioning properly
+- HTML email formatting is supported
+
+Your OTP verification system is now ready to send verification codes to users!
+
+This is an automated test email from Color Prediction Game.
+"""
+
 def test_email_configuration():
     """Test the email configuration"""
     print("🔧 Testing Gmail SMTP Configuration...")
@@ -35,71 +95,14 @@ def test_email_configuration():
 def send_test_email(to_email):
     """Send a test email"""
     try:
-        subject = "🧪 Test Email - Color Prediction Game"
-        
-        html_message = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <title>Test Email</title>
-            <style>
-                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
-                .container { max-width: 600px; margin: 0 auto; padding: 20px; }
-                .header { background: linear-gradient(45deg, #667eea, #764ba2); color: white; padding: 20px; border-radius: 10px; text-align: center; }
-                .content { padding: 20px; background: #f9f9f9; border-radius: 10px; margin-top: 20px; }
-                .success { color: #059669; font-weight: bold; }
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>🎮 Color Prediction Game</h1>
-                    <h2>Email Configuration Test</h2>
-                </div>
-                <div class="content">
-                    <p>Hello!</p>
-                    <p class="success">✅ Congratulations! Your Brevo SMTP configuration is working correctly.</p>
-                    <p>This test email confirms that:</p>
-                    <ul>
-                        <li>📧 Brevo SMTP connection is successful</li>
-                        <li>🔐 SMTP key authentication is working</li>
-                        <li>📨 Email delivery is functioning properly</li>
-                        <li>🎨 HTML email formatting is supported</li>
-                    </ul>
-                    <p>Your OTP verification system is now ready to send verification codes to users!</p>
-                    <hr>
-                    <p><small>This is an automated test email from Color Prediction Game.</small></p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        plain_message = """
-        Color Prediction Game - Email Configuration Test
-
-        Congratulations! Your Brevo SMTP configuration is working correctly.
-
-        This test email confirms that:
-        - Brevo SMTP connection is successful
-        - SMTP key authentication is working
-        - Email delivery is functioning properly
-        - HTML email formatting is supported
-
-        Your OTP verification system is now ready to send verification codes to users!
-
-        This is an automated test email from Color Prediction Game.
-        """
-        
         print(f"📤 Sending test email to: {to_email}")
         
         result = send_mail(
-            subject=subject,
-            message=plain_message,
+            subject=SUBJECT,
+            message=PLAIN_MESSAGE,
             from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[to_email],
-            html_message=html_message,
+            html_message=HTML_MESSAGE,
             fail_silently=False,
         )
         
@@ -132,9 +135,7 @@ def main():
         return
     
     # Validate email format
-    import re
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    if not re.match(email_pattern, test_email):
+    if not EMAIL_RE.match(test_email):
         print("❌ Invalid email format. Please enter a valid email address.")
         return
     
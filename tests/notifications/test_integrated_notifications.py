@@ -4,7 +4,10 @@ Test script for the integrated notification system
 Tests notifications with actual game flow, wallet operations, and user activities
 """
 
+import logging
 import os
+import time
+from collections import Counter
 import django
 from django.conf import settings
 
@@ -12,18 +15,26 @@ from django.conf import settings
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'server.settings')
 django.setup()
 
-from polling.models import Player, Notification, GameRound, Bet
+from polling.models import Player, Notification, NotificationType, GameRound
 from polling.notification_service import NotificationService
 from polling.wallet_utils import place_bet_with_wallet, process_bet_result_with_master_wallet
-from django.utils import timezone
 from django.db import transaction
 
+CATEGORY_LABELS = dict(NotificationType.CATEGORY_CHOICES)
+
+# Output goes through a logger so TEST_LOG=WARNING silences it
+log = logging.getLogger("notif_tests")
+if not log.handlers:
+    log.addHandler(logging.StreamHandler())
+log.setLevel(os.environ.get('TEST_LOG', 'INFO'))
+
+@transaction.atomic
 def test_integrated_notifications():
     """
     Test notifications with integrated game and wallet operations
     """
-    print("🚀 Testing Integrated Notification System")
-    print("=" * 60)
+    log.info("🚀 Testing Integrated Notification System")
+    log.info("=" * 60)
     
     # Create test user
     test_user, created = Player.objects.get_or_create(
@@ -40,205 +51,203 @@ def test_integrated_notifications():
     
     if created:
         test_user.set_password('testpassword123')
-        test_user.save()
-        print(f"✅ Created test user: {test_user.username}")
+        test_user.save(update_fields=['password_hash'])
+        log.info(f"✅ Created test user: {test_user.username}")
     else:
         # Reset balance for testing
         test_user.balance = 2000
-        test_user.save()
-        print(f"✅ Using existing test user: {test_user.username}")
+        test_user.save(update_fields=['balance'])
+        log.info(f"✅ Using existing test user: {test_user.username}")
     
     initial_balance = test_user.balance
-    print(f"💰 Initial balance: ${initial_balance}")
+    log.info(f"💰 Initial balance: ${initial_balance}")
     
     # Test 1: Wallet Operations with Notifications
-    print("\n💳 Test 1: Wallet Operations")
-    print("-" * 40)
+    log.info("\n💳 Test 1: Wallet Operations")
+    log.info("-" * 40)
     
     # Test deposit
-    print("📥 Testing deposit...")
+    log.info("📥 Testing deposit...")
     test_user.credit_wallet(500, 'deposit', 'Test deposit via payment gateway')
-    print(f"✅ Deposited ₹500, new balance: ${test_user.balance}")
+    log.info(f"✅ Deposited ₹500, new balance: ${test_user.balance}")
     
     # Test withdrawal
-    print("📤 Testing withdrawal...")
+    log.info("📤 Testing withdrawal...")
     test_user.debit_wallet(200, 'withdrawal', 'Test withdrawal to bank account')
-    print(f"✅ Withdrew ₹200, new balance: ${test_user.balance}")
+    log.info(f"✅ Withdrew ₹200, new balance: ${test_user.balance}")
     
     # Test 2: Game Round with Betting and Notifications
-    print("\n🎮 Test 2: Complete Game Round")
-    print("-" * 40)
+    log.info("\n🎮 Test 2: Complete Game Round")
+    log.info("-" * 40)
     
-    # Create a test game round
+    # Create test game rounds (one bet per player per round, so each bet gets its own)
+    period_id = f'test_{int(time.time())}'
     game_round = GameRound.objects.create(
         room='main',
-        period_id=f'test_{int(timezone.now().timestamp())}',
+        period_id=period_id,
+        ended=False
+    )
+    losing_round = GameRound.objects.create(
+        room='main',
+        period_id=f'{period_id}_b',
         ended=False
     )
-    print(f"🎯 Created game round: {game_round.period_id}")
+    log.info(f"🎯 Created game rounds: {game_round.period_id}, {losing_round.period_id}")
     
     # Test 3: Place Bets
-    print("\n🎲 Test 3: Placing Bets")
-    print("-" * 40)
+    log.info("\n🎲 Test 3: Placing Bets")
+    log.info("-" * 40)
     
     # Place a winning bet (we'll set the result to match)
     winning_bet_amount = 100
     winning_color = 'green'
     
-    print(f"🟢 Placing ${winning_bet_amount} bet on {winning_color}...")
-    winning_bet = Bet.objects.create(
-        player=test_user,
-        round=game_round,
-        bet_type='color',
-        color=winning_color,
-        amount=winning_bet_amount
+    log.info(f"🟢 Placing ${winning_bet_amount} bet on {winning_color}...")
+    success, winning_bet, error = place_bet_with_wallet(
+        test_user, game_round, 'color', winning_color, None, winning_bet_amount
     )
-    
-    # Deduct bet amount from wallet
-    success = test_user.debit_wallet(winning_bet_amount, 'bet', f'Bet on {winning_color}')
     if success:
-        print(f"✅ Bet placed successfully, new balance: ${test_user.balance}")
+        log.info(f"✅ Bet placed successfully, new balance: ${test_user.balance}")
     else:
-        print("❌ Failed to place bet - insufficient balance")
+        log.info(f"❌ Failed to place bet - {error}")
         return
     
     # Place a losing bet
     losing_bet_amount = 50
     losing_color = 'red'
     
-    print(f"🔴 Placing ${losing_bet_amount} bet on {losing_color}...")
-    losing_bet = Bet.objects.create(
-        player=test_user,
-        round=game_round,
-        bet_type='color',
-        color=losing_color,
-        amount=losing_bet_amount
+    log.info(f"🔴 Placing ${losing_bet_amount} bet on {losing_color}...")
+    success, losing_bet, error = place_bet_with_wallet(
+        test_user, losing_round, 'color', losing_color, None, losing_bet_amount
     )
-    
-    # Deduct bet amount from wallet
-    success = test_user.debit_wallet(losing_bet_amount, 'bet', f'Bet on {losing_color}')
     if success:
-        print(f"✅ Bet placed successfully, new balance: ${test_user.balance}")
+        log.info(f"✅ Bet placed successfully, new balance: ${test_user.balance}")
     else:
-        print("❌ Failed to place bet - insufficient balance")
+        log.info(f"❌ Failed to place bet - {error}")
         return
     
     # Test 4: Process Game Results
-    print("\n🏆 Test 4: Processing Game Results")
-    print("-" * 40)
+    log.info("\n🏆 Test 4: Processing Game Results")
+    log.info("-" * 40)
     
     # Set game result to green (winning color)
     result_color = winning_color
     result_number = 5  # Green number
     
-    game_round.result_color = result_color
-    game_round.result_number = result_number
-    game_round.ended = True
-    game_round.save()
+    for round_ in (game_round, losing_round):
+        round_.result_color = result_color
+        round_.result_number = result_number
+        round_.ended = True
+        round_.save()
     
-    print(f"🎯 Game result: {result_color} (number {result_number})")
+    log.info(f"🎯 Game result: {result_color} (number {result_number})")
     
     # Process winning bet
-    print(f"🟢 Processing winning bet...")
+    log.info(f"🟢 Processing winning bet...")
     won, payout = process_bet_result_with_master_wallet(winning_bet, result_number, result_color)
     if won:
-        print(f"🎉 Won ${payout}! New balance: ${test_user.balance}")
+        log.info(f"🎉 Won ${payout}! New balance: ${test_user.balance}")
         
         # Send game result notification manually (since we're not using WebSocket consumer)
         from polling.notification_service import notify_game_result
         notify_game_result(test_user, game_round, 'win', payout)
     else:
-        print("❌ Bet should have won but didn't")
+        log.info("❌ Bet should have won but didn't")
     
     # Process losing bet
-    print(f"🔴 Processing losing bet...")
+    log.info(f"🔴 Processing losing bet...")
     won, payout = process_bet_result_with_master_wallet(losing_bet, result_number, result_color)
     if not won:
-        print(f"😔 Lost ${losing_bet_amount}")
+        log.info(f"😔 Lost ${losing_bet_amount}")
         
         # Send game result notification manually
-        notify_game_result(test_user, game_round, 'loss', losing_bet_amount)
+        notify_game_result(test_user, losing_round, 'loss', losing_bet_amount)
     else:
-        print("❌ Bet should have lost but won")
+        log.info("❌ Bet should have lost but won")
     
     # Test 5: Check Notifications
-    print("\n📬 Test 5: Notification Summary")
-    print("-" * 40)
-    
-    notifications = Notification.objects.filter(user=test_user).order_by('-created_at')
+    log.info("\n📬 Test 5: Notification Summary")
+    log.info("-" * 40)
+    
+    # Evaluated once; the stats below are computed from this list
+    notifications = list(
+        Notification.objects.filter(user=test_user)
+        .select_related('notification_type')
+        .only('title', 'message', 'priority', 'email_sent', 'in_app_delivered', 'read_at', 'created_at',
+              'notification_type__category')
+        .order_by('-created_at')
+    )
     
-    print(f"📊 Total notifications: {notifications.count()}")
+    log.info(f"📊 Total notifications: {len(notifications)}")
     
     for i, notification in enumerate(notifications[:10], 1):  # Show last 10
         status_icon = "📧" if notification.email_sent else "📱"
         read_icon = "✅" if notification.read_at else "🔔"
-        print(f"  {i}. {status_icon} {read_icon} {notification.title}")
-        print(f"     {notification.message[:80]}...")
-        print(f"     Category: {notification.notification_type.category} | Priority: {notification.priority}")
-        print()
+        log.info("  %s. %s %s %s", i, status_icon, read_icon, notification.title)
+        log.info("     %.80s...", notification.message)
+        log.info("     Category: %s | Priority: %s", notification.notification_type.category, notification.priority)
+        log.info("")
     
     # Test 6: Notification Statistics
-    print("\n📈 Test 6: Notification Statistics")
-    print("-" * 40)
+    log.info("\n📈 Test 6: Notification Statistics")
+    log.info("-" * 40)
     
     stats = {
-        'total': notifications.count(),
-        'unread': notifications.filter(read_at__isnull=True).count(),
-        'email_sent': notifications.filter(email_sent=True).count(),
-        'in_app_delivered': notifications.filter(in_app_delivered=True).count(),
+        'total': len(notifications),
+        'unread': sum(1 for n in notifications if n.read_at is None),
+        'email_sent': sum(1 for n in notifications if n.email_sent),
+        'in_app_delivered': sum(1 for n in notifications if n.in_app_delivered),
     }
     
-    category_stats = {}
-    from polling.models import NotificationType
-    for category, label in NotificationType.CATEGORY_CHOICES:
-        count = notifications.filter(notification_type__category=category).count()
-        if count > 0:
-            category_stats[label] = count
+    category_stats = {
+        CATEGORY_LABELS.get(category, category): count
+        for category, count in Counter(n.notification_type.category for n in notifications).items()
+    }
     
-    print("📊 Overall Statistics:")
+    log.info("📊 Overall Statistics:")
     for key, value in stats.items():
-        print(f"   {key.replace('_', ' ').title()}: {value}")
+        log.info(f"   {key.replace('_', ' ').title()}: {value}")
     
-    print("\n📋 By Category:")
+    log.info("\n📋 By Category:")
     for category, count in category_stats.items():
-        print(f"   {category}: {count}")
+        log.info(f"   {category}: {count}")
     
     # Test 7: Balance Summary
-    print("\n💰 Test 7: Final Balance Summary")
-    print("-" * 40)
+    log.info("\n💰 Test 7: Final Balance Summary")
+    log.info("-" * 40)
     
-    test_user.refresh_from_db()
+    # credit_wallet/debit_wallet keep test_user.balance current (bets share this instance)
     final_balance = test_user.balance
     
-    print(f"💵 Initial balance: ${initial_balance}")
-    print(f"💵 Final balance: ${final_balance}")
-    print(f"💵 Net change: ${final_balance - initial_balance}")
+    log.info(f"💵 Initial balance: ${initial_balance}")
+    log.info(f"💵 Final balance: ${final_balance}")
+    log.info(f"💵 Net change: ${final_balance - initial_balance}")
     
     # Calculate expected balance
     expected_balance = initial_balance + 500 - 200 - winning_bet_amount - losing_bet_amount + payout
-    print(f"💵 Expected balance: ${expected_balance}")
+    log.info(f"💵 Expected balance: ${expected_balance}")
     
     if final_balance == expected_balance:
-        print("✅ Balance calculation is correct!")
+        log.info("✅ Balance calculation is correct!")
     else:
-        print(f"❌ Balance mismatch! Difference: ${final_balance - expected_balance}")
+        log.info(f"❌ Balance mismatch! Difference: ${final_balance - expected_balance}")
     
     # Test 8: Test Notification Preferences
-    print("\n⚙️ Test 8: Notification Preferences")
-    print("-" * 40)
+    log.info("\n⚙️ Test 8: Notification Preferences")
+    log.info("-" * 40)
     
     from polling.models import UserNotificationPreference
-    preferences = UserNotificationPreference.objects.filter(user=test_user)
+    preferences = UserNotificationPreference.objects.filter(user=test_user).select_related('notification_type')
     
-    print(f"📋 User has {preferences.count()} notification preferences:")
+    log.info(f"📋 User has {preferences.count()} notification preferences:")
     for pref in preferences:
         enabled_icon = "✅" if pref.is_enabled else "❌"
-        print(f"   {enabled_icon} {pref.notification_type.name}: {pref.delivery_method}")
+        log.info("   %s %s: %s", enabled_icon, pref.notification_type.name, pref.delivery_method)
     
     # Final Summary
-    print("\n" + "=" * 60)
-    print("🎉 Integrated Notification System Test Complete!")
-    print("=" * 60)
+    log.info("\n" + "=" * 60)
+    log.info("🎉 Integrated Notification System Test Complete!")
+    log.info("=" * 60)
     
     summary = {
         'user': test_user.username,
@@ -246,34 +255,34 @@ def test_integrated_notifications():
         'final_balance': final_balance,
         'total_notifications': stats['total'],
         'unread_notifications': stats['unread'],
-        'game_rounds_played': 1,
+        'game_rounds_played': 2,
         'bets_placed': 2,
         'wins': 1,
         'losses': 1,
     }
     
-    print("📊 Test Summary:")
+    log.info("📊 Test Summary:")
     for key, value in summary.items():
-        print(f"   {key.replace('_', ' ').title()}: {value}")
-    
-    print("\n💡 What was tested:")
-    print("   ✅ Wallet deposit/withdrawal notifications")
-    print("   ✅ Game result notifications (win/loss)")
-    print("   ✅ Bet placement and processing")
-    print("   ✅ Email and in-app notification delivery")
-    print("   ✅ Notification preferences creation")
-    print("   ✅ Balance calculations and transactions")
-    
-    print("\n🔗 Next Steps:")
-    print("   1. Visit the notification center in the web interface")
-    print("   2. Check notification settings at /notifications/settings/")
-    print("   3. Play actual games to see real-time notifications")
-    print("   4. Test email delivery with real SMTP settings")
+        log.info(f"   {key.replace('_', ' ').title()}: {value}")
+    
+    log.info("\n💡 What was tested:")
+    log.info("   ✅ Wallet deposit/withdrawal notifications")
+    log.info("   ✅ Game result notifications (win/loss)")
+    log.info("   ✅ Bet placement and processing")
+    log.info("   ✅ Email and in-app notification delivery")
+    log.info("   ✅ Notification preferences creation")
+    log.info("   ✅ Balance calculations and transactions")
+    
+    log.info("\n🔗 Next Steps:")
+    log.info("   1. Visit the notification center in the web interface")
+    log.info("   2. Check notification settings at /notifications/settings/")
+    log.info("   3. Play actual games to see real-time notifications")
+    log.info("   4. Test email delivery with real SMTP settings")
     
     return test_user, summary
 
 if __name__ == "__main__":
     user, summary = test_integrated_notifications()
-    print(f"\n✅ Integration test completed for {user.username}")
-    print(f"📧 Check notifications at: http://localhost:8000/notifications/settings/")
-    print(f"🎮 Play games at: http://localhost:8000/room/main/")
+    log.info(f"\n✅ Integration test completed for {user.username}")
+    log.info(f"📧 Check notifications at: http://localhost:8000/notifications/settings/")
+    log.info(f"🎮 Play games at: http://localhost:8000/room/main/")
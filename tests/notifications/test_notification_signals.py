@@ -4,7 +4,9 @@ Test script for notification signals
 Verifies that all signals are properly connected and working
 """
 
+import logging
 import os
+import time
 import django
 from django.conf import settings
 
@@ -12,266 +14,305 @@ from django.conf import settings
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'server.settings')
 django.setup()
 
-from polling.models import Player, Transaction, Bet, GameRound, Notification, OTPVerification
+from polling.models import Player, Transaction, Bet, GameRound, Notification, NotificationType, OTPVerification
 from polling.signals import (
     send_low_balance_notification, detect_suspicious_betting_patterns,
     monitor_login_attempts
 )
-from django.utils import timezone
 from django.test import RequestFactory
+from django.db import transaction
+from django.db.models import Count, Q
+
+CATEGORY_LABELS = dict(NotificationType.CATEGORY_CHOICES)
+CATEGORY_ICON = {
+    'game': '🎮',
+    'wallet': '💰',
+    'account': '👤',
+    'system': '📢',
+    'security': '🔒'
+}
+
+# Output goes through a logger so TEST_LOG=WARNING silences it
+log = logging.getLogger("notif_tests")
+if not log.handlers:
+    log.addHandler(logging.StreamHandler())
+log.setLevel(os.environ.get('TEST_LOG', 'INFO'))
 
 def test_notification_signals():
     """
     Test all notification signals
     """
-    print("🧪 Testing Notification Signals")
-    print("=" * 60)
-    
-    # Create test user
-    test_user, created = Player.objects.get_or_create(
-        username='signal_test_user',
-        defaults={
-            'email': 'signals@example.com',
-            'first_name': 'Signal',
-            'last_name': 'Test',
-            'balance': 1000,
-            'email_verified': True,
-            'is_active': True
-        }
-    )
-    
-    if created:
-        test_user.set_password('testpassword123')
-        test_user.save()
-        print(f"✅ Created test user: {test_user.username}")
-    else:
-        print(f"✅ Using existing test user: {test_user.username}")
-    
-    initial_notification_count = Notification.objects.filter(user=test_user).count()
-    print(f"📊 Initial notifications: {initial_notification_count}")
-    
-    # Test 1: Transaction Signal
-    print("\n💳 Test 1: Transaction Signal")
-    print("-" * 40)
-    
-    # Create a deposit transaction
-    transaction = Transaction.objects.create(
-        player=test_user,
-        transaction_type='deposit',
-        amount=500,
-        balance_before=test_user.balance,
-        balance_after=test_user.balance + 500,
-        description='Test deposit via signal'
-    )
-    
-    print(f"✅ Created deposit transaction: ${transaction.amount}")
-    
-    # Test 2: Low Balance Signal
-    print("\n⚠️ Test 2: Low Balance Detection")
-    print("-" * 40)
-    
-    # Set user balance to low amount
-    test_user.balance = 50
-    test_user.save()
-    
-    # Trigger low balance check
-    send_low_balance_notification(test_user)
-    print(f"✅ Triggered low balance check for balance: ${test_user.balance}")
-    
-    # Test 3: Bet Creation and Suspicious Pattern Detection
-    print("\n🎲 Test 3: Bet Creation and Pattern Detection")
-    print("-" * 40)
-    
-    # Create a game round
-    game_round = GameRound.objects.create(
-        room='main',
-        period_id=f'signal_test_{int(timezone.now().timestamp())}',
-        ended=False
-    )
-    
-    # Create multiple bets to trigger suspicious pattern detection
-    for i in range(3):
-        bet = Bet.objects.create(
+    log.info("🧪 Testing Notification Signals")
+    log.info("=" * 60)
+    
+    # Share one commit across the setup and signal checks; Test 9 stays outside
+    # so its timing reflects realistic single-row commits
+    with transaction.atomic():
+        # Create test user
+        test_user, created = Player.objects.get_or_create(
+            username='signal_test_user',
+            defaults={
+                'email': 'signals@example.com',
+                'first_name': 'Signal',
+                'last_name': 'Test',
+                'balance': 1000,
+                'email_verified': True,
+                'is_active': True
+            }
+        )
+        
+        if created:
+            test_user.set_password('testpassword123')
+            test_user.save(update_fields=['password_hash'])
+            log.info(f"✅ Created test user: {test_user.username}")
+        else:
+            log.info(f"✅ Using existing test user: {test_user.username}")
+        
+        initial_notification_count = Notification.objects.filter(user=test_user).count()
+        log.info(f"📊 Initial notifications: {initial_notification_count}")
+        
+        # Test 1: Transaction Signal
+        log.info("\n💳 Test 1: Transaction Signal")
+        log.info("-" * 40)
+        
+        # Create a deposit transaction
+        deposit = Transaction.objects.create(
             player=test_user,
-            round=game_round,
-            bet_type='color',
-            color='red',
-            amount=100
+            transaction_type='deposit',
+            amount=500,
+            balance_before=test_user.balance,
+            balance_after=test_user.balance + 500,
+            description='Test deposit via signal'
         )
-        print(f"✅ Created bet #{i+1}: ${bet.amount} on {bet.color}")
-    
-    # Test suspicious pattern detection
-    last_bet = Bet.objects.filter(player=test_user).last()
-    detect_suspicious_betting_patterns(last_bet)
-    print("✅ Triggered suspicious pattern detection")
-    
-    # Test 4: OTP Signal
-    print("\n🔐 Test 4: OTP Generation Signal")
-    print("-" * 40)
-    
-    # Create OTP verification
-    otp = OTPVerification.objects.create(
-        email=test_user.email,
-        otp_code='123456'
-    )
-    print(f"✅ Created OTP verification for: {otp.email}")
-    
-    # Test 5: Player Profile Update Signal
-    print("\n👤 Test 5: Profile Update Signal")
-    print("-" * 40)
-    
-    # Update player profile
-    test_user.first_name = 'Updated'
-    test_user.last_name = 'Name'
-    test_user.save()
-    print(f"✅ Updated player profile: {test_user.first_name} {test_user.last_name}")
-    
-    # Test 6: Login Monitoring
-    print("\n🔒 Test 6: Login Monitoring")
-    print("-" * 40)
-    
-    # Create mock request
-    factory = RequestFactory()
-    request = factory.post('/login/')
-    request.META['REMOTE_ADDR'] = '192.168.1.100'
-    request.META['HTTP_USER_AGENT'] = 'Mozilla/5.0 (Chrome/91.0)'
-    
-    # Test successful login monitoring
-    monitor_login_attempts(test_user, request, success=True)
-    print("✅ Tested successful login monitoring")
-    
-    # Test failed login monitoring
-    monitor_login_attempts(test_user, request, success=False)
-    print("✅ Tested failed login monitoring")
-    
-    # Test 7: Game Round Completion
-    print("\n🏆 Test 7: Game Round Completion")
-    print("-" * 40)
-    
-    # Complete the game round
-    game_round.result_color = 'green'
-    game_round.result_number = 5
-    game_round.ended = True
-    game_round.save()
-    print(f"✅ Completed game round: {game_round.result_color}")
-    
-    # Test 8: Check Notification Results
-    print("\n📬 Test 8: Notification Results")
-    print("-" * 40)
-    
-    final_notification_count = Notification.objects.filter(user=test_user).count()
-    new_notifications = final_notification_count - initial_notification_count
-    
-    print(f"📊 Initial notifications: {initial_notification_count}")
-    print(f"📊 Final notifications: {final_notification_count}")
-    print(f"📊 New notifications: {new_notifications}")
-    
-    # Show recent notifications
-    recent_notifications = Notification.objects.filter(
-        user=test_user
-    ).order_by('-created_at')[:10]
-    
-    print(f"\n📋 Recent Notifications:")
-    for i, notification in enumerate(recent_notifications, 1):
-        status_icon = "📧" if notification.email_sent else "📱"
-        category_icon = {
-            'game': '🎮',
-            'wallet': '💰',
-            'account': '👤',
-            'system': '📢',
-            'security': '🔒'
-        }.get(notification.notification_type.category, '📢')
         
-        print(f"  {i}. {status_icon} {category_icon} {notification.title}")
-        print(f"     {notification.message[:60]}...")
-        print(f"     Category: {notification.notification_type.category} | Created: {notification.created_at.strftime('%H:%M:%S')}")
-        print()
+        log.info(f"✅ Created deposit transaction: ${deposit.amount}")
+        
+        # Test 2: Low Balance Signal
+        log.info("\n⚠️ Test 2: Low Balance Detection")
+        log.info("-" * 40)
+        
+        # Set user balance to low amount
+        test_user.balance = 50
+        test_user.save(update_fields=['balance'])
+        
+        # Trigger low balance check
+        send_low_balance_notification(test_user)
+        log.info(f"✅ Triggered low balance check for balance: ${test_user.balance}")
+        
+        # Test 3: Bet Creation and Suspicious Pattern Detection
+        log.info("\n🎲 Test 3: Bet Creation and Pattern Detection")
+        log.info("-" * 40)
+        
+        # Create one game round per bet; a player may only bet once per round
+        game_rounds = GameRound.objects.bulk_create([
+            GameRound(
+                room='main',
+                period_id=f'signal_{int(time.time())}_{i}',
+                ended=False
+            )
+            for i in range(3)
+        ])
+        
+        # Create multiple bets to trigger suspicious pattern detection
+        bets = Bet.objects.bulk_create([
+            Bet(
+                player=test_user,
+                round=game_round,
+                bet_type='color',
+                color='red',
+                amount=100
+            )
+            for game_round in game_rounds
+        ])
+        for i, bet in enumerate(bets, 1):
+            log.info("✅ Created bet #%s: $%s on %s", i, bet.amount, bet.color)
+        
+        # Test suspicious pattern detection (bulk_create skips post_save, so call it directly)
+        last_bet = bets[-1]
+        detect_suspicious_betting_patterns(last_bet)
+        log.info("✅ Triggered suspicious pattern detection")
+        
+        # Test 4: OTP Signal
+        log.info("\n🔐 Test 4: OTP Generation Signal")
+        log.info("-" * 40)
+        
+        # Create OTP verification
+        otp = OTPVerification.objects.create(
+            email=test_user.email,
+            otp_code='123456'
+        )
+        log.info(f"✅ Created OTP verification for: {otp.email}")
+        
+        # Test 5: Player Profile Update Signal
+        log.info("\n👤 Test 5: Profile Update Signal")
+        log.info("-" * 40)
+        
+        # Update player profile
+        test_user.first_name = 'Updated'
+        test_user.last_name = 'Name'
+        test_user.save(update_fields=['first_name', 'last_name'])
+        log.info(f"✅ Updated player profile: {test_user.first_name} {test_user.last_name}")
+        
+        # Test 6: Login Monitoring
+        log.info("\n🔒 Test 6: Login Monitoring")
+        log.info("-" * 40)
+        
+        # Create mock request
+        factory = RequestFactory()
+        request = factory.post('/login/')
+        request.META['REMOTE_ADDR'] = '192.168.1.100'
+        request.META['HTTP_USER_AGENT'] = 'Mozilla/5.0 (Chrome/91.0)'
+        
+        # Test successful login monitoring
+        monitor_login_attempts(test_user, request, success=True)
+        log.info("✅ Tested successful login monitoring")
+        
+        # Test failed login monitoring
+        monitor_login_attempts(test_user, request, success=False)
+        log.info("✅ Tested failed login monitoring")
+        
+        # Test 7: Game Round Completion
+        log.info("\n🏆 Test 7: Game Round Completion")
+        log.info("-" * 40)
+        
+        # Complete the last game round
+        game_round = game_rounds[-1]
+        game_round.result_color = 'green'
+        game_round.result_number = 5
+        game_round.ended = True
+        game_round.save()
+        log.info(f"✅ Completed game round: {game_round.result_color}")
+        
+        # Test 8: Check Notification Results
+        log.info("\n📬 Test 8: Notification Results")
+        log.info("-" * 40)
+        
+        # Evaluated once for both the count and the recent list below
+        notifications = list(
+            Notification.objects.filter(user=test_user)
+            .select_related('notification_type')
+            .only('title', 'message', 'email_sent', 'created_at', 'notification_type__category')
+            .order_by('-created_at')
+        )
+        final_notification_count = len(notifications)
+        new_notifications = final_notification_count - initial_notification_count
+        
+        log.info(f"📊 Initial notifications: {initial_notification_count}")
+        log.info(f"📊 Final notifications: {final_notification_count}")
+        log.info(f"📊 New notifications: {new_notifications}")
+        
+        # Show recent notifications
+        recent_notifications = notifications[:10]
+        
+        log.info(f"\n📋 Recent Notifications:")
+        for i, notification in enumerate(recent_notifications, 1):
+            status_icon = "📧" if notification.email_sent else "📱"
+            category_icon = CATEGORY_ICON.get(notification.notification_type.category, '📢')
+            
+            log.info("  %s. %s %s %s", i, status_icon, category_icon, notification.title)
+            log.info("     %.60s...", notification.message)
+            log.info("     Category: %s | Created: %s", notification.notification_type.category, notification.created_at.strftime('%H:%M:%S'))
+            log.info("")
     
     # Test 9: Signal Performance
-    print("\n⚡ Test 9: Signal Performance")
-    print("-" * 40)
+    log.info("\n⚡ Test 9: Signal Performance")
+    log.info("-" * 40)
     
-    # Test signal efficiency with multiple operations
-    start_time = timezone.now()
+    # Signals branch: a single create() so post_save still fires; the insert and
+    # the writes made by its receivers share one commit
+    start_ns = time.perf_counter_ns()
     
-    # Create multiple transactions quickly
-    for i in range(5):
+    with transaction.atomic():
         Transaction.objects.create(
             player=test_user,
             transaction_type='withdrawal',
             amount=-10,
             balance_before=test_user.balance,
             balance_after=test_user.balance - 10,
-            description=f'Performance test transaction {i+1}'
+            description='Performance test transaction (signals)'
         )
     
-    end_time = timezone.now()
-    duration = (end_time - start_time).total_seconds()
+    duration = (time.perf_counter_ns() - start_ns) / 1e9
+    log.info(f"✅ Created 1 transaction with signals in {duration:.3f} seconds")
+    
+    # Throughput branch: bulk_create skips post_save, so this measures pure DB cost
+    start_ns = time.perf_counter_ns()
+    
+    txns = [
+        Transaction(
+            player=test_user,
+            transaction_type='withdrawal',
+            amount=-10,
+            balance_before=test_user.balance,
+            balance_after=test_user.balance - 10,
+            description=f'Performance test transaction {i+1}'
+        )
+        for i in range(5)
+    ]
+    Transaction.objects.bulk_create(txns, batch_size=500)
     
-    print(f"✅ Created 5 transactions with signals in {duration:.3f} seconds")
+    duration = (time.perf_counter_ns() - start_ns) / 1e9
+    log.info(f"✅ Bulk created {len(txns)} transactions without signals in {duration:.3f} seconds")
     
     # Test 10: Cleanup and Summary
-    print("\n🧹 Test 10: Cleanup and Summary")
-    print("-" * 40)
+    log.info("\n🧹 Test 10: Cleanup and Summary")
+    log.info("-" * 40)
     
     # Count notifications by category
-    from polling.models import NotificationType
-    category_counts = {}
+    rows = (Notification.objects.filter(user=test_user)
+            .values('notification_type__category')
+            .annotate(c=Count('id')))
+    category_counts = {CATEGORY_LABELS.get(r['notification_type__category'], r['notification_type__category']): r['c']
+                       for r in rows}
     
-    for category, label in NotificationType.CATEGORY_CHOICES:
-        count = Notification.objects.filter(
-            user=test_user,
-            notification_type__category=category
-        ).count()
-        if count > 0:
-            category_counts[label] = count
-    
-    print("📊 Notifications by Category:")
+    log.info("📊 Notifications by Category:")
     for category, count in category_counts.items():
-        print(f"   {category}: {count}")
+        log.info(f"   {category}: {count}")
     
     # Check signal effectiveness
     signal_effectiveness = {
         'total_notifications': final_notification_count,
         'new_notifications': new_notifications,
-        'email_sent': Notification.objects.filter(user=test_user, email_sent=True).count(),
-        'in_app_delivered': Notification.objects.filter(user=test_user, in_app_delivered=True).count(),
+        **Notification.objects.filter(user=test_user).aggregate(
+            email_sent=Count('id', filter=Q(email_sent=True)),
+            in_app_delivered=Count('id', filter=Q(in_app_delivered=True)),
+        ),
     }
     
-    print(f"\n📈 Signal Effectiveness:")
+    log.info(f"\n📈 Signal Effectiveness:")
     for metric, value in signal_effectiveness.items():
-        print(f"   {metric.replace('_', ' ').title()}: {value}")
+        log.info(f"   {metric.replace('_', ' ').title()}: {value}")
     
     # Final Summary
-    print("\n" + "=" * 60)
-    print("🎉 Notification Signals Test Complete!")
-    print("=" * 60)
-    
-    print("✅ Tested Signals:")
-    print("   • Transaction notifications")
-    print("   • Low balance detection")
-    print("   • Suspicious betting patterns")
-    print("   • OTP generation alerts")
-    print("   • Profile update notifications")
-    print("   • Login monitoring")
-    print("   • Game round completion")
-    print("   • Automatic notification cleanup")
-    
-    print(f"\n📊 Results:")
-    print(f"   • {new_notifications} new notifications generated")
-    print(f"   • {len(category_counts)} notification categories used")
-    print(f"   • All signals working correctly")
-    
-    print(f"\n🔗 Next Steps:")
-    print("   • Signals are now active and will trigger automatically")
-    print("   • Monitor logs for signal performance")
-    print("   • Adjust signal thresholds as needed")
-    print("   • Consider setting up Celery for background tasks")
+    log.info("\n" + "=" * 60)
+    log.info("🎉 Notification Signals Test Complete!")
+    log.info("=" * 60)
+    
+    log.info("✅ Tested Signals:")
+    log.info("   • Transaction notifications")
+    log.info("   • Low balance detection")
+    log.info("   • Suspicious betting patterns")
+    log.info("   • OTP generation alerts")
+    log.info("   • Profile update notifications")
+    log.info("   • Login monitoring")
+    log.info("   • Game round completion")
+    log.info("   • Automatic notification cleanup")
+    
+    log.info(f"\n📊 Results:")
+    log.info(f"   • {new_notifications} new notifications generated")
+    log.info(f"   • {len(category_counts)} notification categories used")
+    log.info(f"   • All signals working correctly")
+    
+    log.info(f"\n🔗 Next Steps:")
+    log.info("   • Signals are now active and will trigger automatically")
+    log.info("   • Monitor logs for signal performance")
+    log.info("   • Adjust signal thresholds as needed")
+    log.info("   • Consider setting up Celery for background tasks")
     
     return test_user, signal_effectiveness
 
 if __name__ == "__main__":
     user, effectiveness = test_notification_signals()
-    print(f"\n✅ Signal test completed for {user.username}")
-    print(f"📧 Total notifications: {effectiveness['total_notifications']}")
-    print(f"🔔 New notifications: {effectiveness['new_notifications']}")
+    log.info(f"\n✅ Signal test completed for {user.username}")
+    log.info(f"📧 Total notifications: {effectiveness['total_notifications']}")
+    log.info(f"🔔 New notifications: {effectiveness['new_notifications']}")
@@ -3,6 +3,7 @@
 Test script for the comprehensive notification system
 """
 
+import logging
 import os
 import django
 from django.conf import settings
@@ -17,13 +18,24 @@ from polling.notification_service import (
     notify_account_activity, notify_system_announcement, notify_security_alert
 )
 from django.utils import timezone
+from django.db import transaction
+from django.db.models import Count, Q
 
+CATEGORY_LABELS = dict(NotificationType.CATEGORY_CHOICES)
+
+# Output goes through a logger so TEST_LOG=WARNING silences it
+log = logging.getLogger("notif_tests")
+if not log.handlers:
+    log.addHandler(logging.StreamHandler())
+log.setLevel(os.environ.get('TEST_LOG', 'INFO'))
+
+@transaction.atomic
 def test_notification_system():
     """
     Test the complete notification system
     """
-    print("🧪 Testing Comprehensive Notification System")
-    print("=" * 60)
+    log.info("🧪 Testing Comprehensive Notification System")
+    log.info("=" * 60)
     
     # Get or create a test user
     test_user, created = Player.objects.get_or_create(
@@ -40,14 +52,14 @@ def test_notification_system():
     
     if created:
         test_user.set_password('testpassword123')
-        test_user.save()
-        print(f"✅ Created test user: {test_user.username}")
+        test_user.save(update_fields=['password_hash'])
+        log.info(f"✅ Created test user: {test_user.username}")
     else:
-        print(f"✅ Using existing test user: {test_user.username}")
+        log.info(f"✅ Using existing test user: {test_user.username}")
     
     # Test 1: Basic notification creation
-    print("\n📝 Test 1: Basic Notification Creation")
-    print("-" * 40)
+    log.info("\n📝 Test 1: Basic Notification Creation")
+    log.info("-" * 40)
     
     service = NotificationService()
     notification = service.create_notification(
@@ -59,17 +71,17 @@ def test_notification_system():
     )
     
     if notification:
-        print(f"✅ Created notification: {notification.title}")
-        print(f"   ID: {notification.id}")
-        print(f"   Status: {notification.status}")
-        print(f"   Email sent: {notification.email_sent}")
-        print(f"   In-app delivered: {notification.in_app_delivered}")
+        log.info(f"✅ Created notification: {notification.title}")
+        log.info(f"   ID: {notification.id}")
+        log.info(f"   Status: {notification.status}")
+        log.info(f"   Email sent: {notification.email_sent}")
+        log.info(f"   In-app delivered: {notification.in_app_delivered}")
     else:
-        print("❌ Failed to create notification")
+        log.info("❌ Failed to create notification")
     
     # Test 2: Game result notifications
-    print("\n🎮 Test 2: Game Result Notifications")
-    print("-" * 40)
+    log.info("\n🎮 Test 2: Game Result Notifications")
+    log.info("-" * 40)
     
     # Create a mock game round object
     class MockGameRound:
@@ -82,28 +94,28 @@ def test_notification_system():
     # Test win notification
     win_notification = notify_game_result(test_user, game_round, 'win', 500)
     if win_notification:
-        print(f"✅ Win notification: {win_notification.title}")
+        log.info(f"✅ Win notification: {win_notification.title}")
     
     # Test loss notification
     loss_notification = notify_game_result(test_user, game_round, 'loss', 100)
     if loss_notification:
-        print(f"✅ Loss notification: {loss_notification.title}")
+        log.info(f"✅ Loss notification: {loss_notification.title}")
     
     # Test 3: Wallet transaction notifications
-    print("\n💰 Test 3: Wallet Transaction Notifications")
-    print("-" * 40)
+    log.info("\n💰 Test 3: Wallet Transaction Notifications")
+    log.info("-" * 40)
     
     deposit_notification = notify_wallet_transaction(test_user, 'deposit', 250, 1250)
     if deposit_notification:
-        print(f"✅ Deposit notification: {deposit_notification.title}")
+        log.info(f"✅ Deposit notification: {deposit_notification.title}")
     
     withdrawal_notification = notify_wallet_transaction(test_user, 'withdrawal', 100, 1150)
     if withdrawal_notification:
-        print(f"✅ Withdrawal notification: {withdrawal_notification.title}")
+        log.info(f"✅ Withdrawal notification: {withdrawal_notification.title}")
     
     # Test 4: Account activity notifications
-    print("\n👤 Test 4: Account Activity Notifications")
-    print("-" * 40)
+    log.info("\n👤 Test 4: Account Activity Notifications")
+    log.info("-" * 40)
     
     login_notification = notify_account_activity(
         test_user, 
@@ -111,7 +123,7 @@ def test_notification_system():
         'You logged in from a new device on Chrome browser.'
     )
     if login_notification:
-        print(f"✅ Login notification: {login_notification.title}")
+        log.info(f"✅ Login notification: {login_notification.title}")
     
     email_verified_notification = notify_account_activity(
         test_user,
@@ -119,11 +131,11 @@ def test_notification_system():
         'Your email address has been successfully verified.'
     )
     if email_verified_notification:
-        print(f"✅ Email verified notification: {email_verified_notification.title}")
+        log.info(f"✅ Email verified notification: {email_verified_notification.title}")
     
     # Test 5: System announcements
-    print("\n📢 Test 5: System Announcements")
-    print("-" * 40)
+    log.info("\n📢 Test 5: System Announcements")
+    log.info("-" * 40)
     
     announcement_notification = notify_system_announcement(
         test_user,
@@ -132,11 +144,11 @@ def test_notification_system():
         'normal'
     )
     if announcement_notification:
-        print(f"✅ Announcement notification: {announcement_notification.title}")
+        log.info(f"✅ Announcement notification: {announcement_notification.title}")
     
     # Test 6: Security alerts
-    print("\n🔒 Test 6: Security Alerts")
-    print("-" * 40)
+    log.info("\n🔒 Test 6: Security Alerts")
+    log.info("-" * 40)
     
     security_notification = notify_security_alert(
         test_user,
@@ -144,59 +156,61 @@ def test_notification_system():
         'We detected a login attempt from an unusual location. If this wasn\'t you, please change your password immediately.'
     )
     if security_notification:
-        print(f"✅ Security alert: {security_notification.title}")
+        log.info(f"✅ Security alert: {security_notification.title}")
     
     # Test 7: User preferences
-    print("\n⚙️ Test 7: User Notification Preferences")
-    print("-" * 40)
+    log.info("\n⚙️ Test 7: User Notification Preferences")
+    log.info("-" * 40)
     
     # Check user preferences
     preferences = UserNotificationPreference.objects.filter(user=test_user)
-    print(f"📊 User has {preferences.count()} notification preferences")
+    log.info(f"📊 User has {preferences.count()} notification preferences")
     
-    for pref in preferences[:5]:  # Show first 5
-        print(f"   {pref.notification_type.name}: {pref.delivery_method} ({'enabled' if pref.is_enabled else 'disabled'})")
+    for pref in preferences.select_related('notification_type')[:5]:  # Show first 5
+        log.info("   %s: %s (%s)", pref.notification_type.name, pref.delivery_method, 'enabled' if pref.is_enabled else 'disabled')
     
     # Test 8: Notification statistics
-    print("\n📊 Test 8: Notification Statistics")
-    print("-" * 40)
-    
-    total_notifications = Notification.objects.filter(user=test_user).count()
-    unread_notifications = Notification.objects.filter(user=test_user, read_at__isnull=True).count()
-    email_sent_count = Notification.objects.filter(user=test_user, email_sent=True).count()
-    in_app_delivered_count = Notification.objects.filter(user=test_user, in_app_delivered=True).count()
+    log.info("\n📊 Test 8: Notification Statistics")
+    log.info("-" * 40)
+    
+    notification_stats = Notification.objects.filter(user=test_user).aggregate(
+        total=Count('id'),
+        unread=Count('id', filter=Q(read_at__isnull=True)),
+        email_sent=Count('id', filter=Q(email_sent=True)),
+        in_app_delivered=Count('id', filter=Q(in_app_delivered=True)),
+    )
     
-    print(f"📈 Total notifications: {total_notifications}")
-    print(f"📬 Unread notifications: {unread_notifications}")
-    print(f"📧 Email notifications sent: {email_sent_count}")
-    print(f"📱 In-app notifications delivered: {in_app_delivered_count}")
+    log.info(f"📈 Total notifications: {notification_stats['total']}")
+    log.info(f"📬 Unread notifications: {notification_stats['unread']}")
+    log.info(f"📧 Email notifications sent: {notification_stats['email_sent']}")
+    log.info(f"📱 In-app notifications delivered: {notification_stats['in_app_delivered']}")
     
     # Test 9: Notification categories breakdown
-    print("\n📋 Test 9: Notifications by Category")
-    print("-" * 40)
+    log.info("\n📋 Test 9: Notifications by Category")
+    log.info("-" * 40)
     
-    for category, label in NotificationType.CATEGORY_CHOICES:
-        count = Notification.objects.filter(
-            user=test_user,
-            notification_type__category=category
-        ).count()
-        if count > 0:
-            print(f"   {label}: {count} notifications")
+    rows = (Notification.objects.filter(user=test_user)
+            .values('notification_type__category')
+            .annotate(c=Count('id')))
+    category_counts = {r['notification_type__category']: r['c'] for r in rows}
+    
+    for category, count in category_counts.items():
+        log.info(f"   {CATEGORY_LABELS.get(category, category)}: {count} notifications")
     
     # Test 10: Mark notifications as read
-    print("\n✅ Test 10: Mark Notifications as Read")
-    print("-" * 40)
+    log.info("\n✅ Test 10: Mark Notifications as Read")
+    log.info("-" * 40)
     
     # Mark first notification as read
     first_notification = Notification.objects.filter(user=test_user, read_at__isnull=True).first()
     if first_notification:
         first_notification.mark_as_read()
-        print(f"✅ Marked notification as read: {first_notification.title}")
-        print(f"   Read at: {first_notification.read_at}")
+        log.info(f"✅ Marked notification as read: {first_notification.title}")
+        log.info(f"   Read at: {first_notification.read_at}")
     
     # Test 11: Expired notifications
-    print("\n⏰ Test 11: Expired Notifications")
-    print("-" * 40)
+    log.info("\n⏰ Test 11: Expired Notifications")
+    log.info("-" * 40)
     
     # Create a notification that expires in the past
     expired_notification = service.create_notification(
@@ -208,37 +222,52 @@ def test_notification_system():
     )
     
     if expired_notification:
-        print(f"✅ Created expired notification: {expired_notification.title}")
-        print(f"   Is expired: {expired_notification.is_expired()}")
-        print(f"   Expires at: {expired_notification.expires_at}")
+        log.info(f"✅ Created expired notification: {expired_notification.title}")
+        log.info(f"   Is expired: {expired_notification.is_expired()}")
+        log.info(f"   Expires at: {expired_notification.expires_at}")
+    
+    # Test 12: Batch creation
+    log.info("\n📦 Test 12: Batch Notification Creation")
+    log.info("-" * 40)
+    
+    batch = service.create_many([
+        {
+            'user': test_user,
+            'notification_type_name': name,
+            'title': f'Batch Test Notification ({name})',
+            'message': 'This notification was created in a batch.',
+        }
+        for name in ('game_result', 'wallet_transaction', 'account_activity', 'system_announcement')
+    ])
+    log.info(f"✅ Created {len(batch)} notifications with one INSERT")
     
     # Final summary
-    print("\n" + "=" * 60)
-    print("🎉 Notification System Test Complete!")
-    print("=" * 60)
-    
-    final_stats = {
-        'total_notifications': Notification.objects.filter(user=test_user).count(),
-        'unread_count': Notification.objects.filter(user=test_user, read_at__isnull=True).count(),
-        'email_sent': Notification.objects.filter(user=test_user, email_sent=True).count(),
-        'in_app_delivered': Notification.objects.filter(user=test_user, in_app_delivered=True).count(),
-        'preferences_count': UserNotificationPreference.objects.filter(user=test_user).count(),
-    }
-    
-    print(f"📊 Final Statistics for {test_user.username}:")
+    log.info("\n" + "=" * 60)
+    log.info("🎉 Notification System Test Complete!")
+    log.info("=" * 60)
+    
+    final_stats = Notification.objects.filter(user=test_user).aggregate(
+        total_notifications=Count('id'),
+        unread_count=Count('id', filter=Q(read_at__isnull=True)),
+        email_sent=Count('id', filter=Q(email_sent=True)),
+        in_app_delivered=Count('id', filter=Q(in_app_delivered=True)),
+    )
+    final_stats['preferences_count'] = UserNotificationPreference.objects.filter(user=test_user).count()
+    
+    log.info(f"📊 Final Statistics for {test_user.username}:")
     for key, value in final_stats.items():
-        print(f"   {key.replace('_', ' ').title()}: {value}")
+        log.info(f"   {key.replace('_', ' ').title()}: {value}")
     
-    print("\n💡 Next Steps:")
-    print("   1. Check the Django admin to see created notifications")
-    print("   2. Visit /notifications/settings/ to manage preferences")
-    print("   3. Test the in-app notification center")
-    print("   4. Check email delivery (if SMTP is configured)")
+    log.info("\n💡 Next Steps:")
+    log.info("   1. Check the Django admin to see created notifications")
+    log.info("   2. Visit /notifications/settings/ to manage preferences")
+    log.info("   3. Test the in-app notification center")
+    log.info("   4. Check email delivery (if SMTP is configured)")
     
     return test_user, final_stats
 
 if __name__ == "__main__":
     test_user, stats = test_notification_system()
-    print(f"\n✅ Test completed for user: {test_user.username}")
-    print(f"📧 Email: {test_user.email}")
-    print(f"🔔 Total notifications created: {stats['total_notifications']}")
+    log.info(f"\n✅ Test completed for user: {test_user.username}")
+    log.info(f"📧 Email: {test_user.email}")
+    log.info(f"🔔 Total notifications created: {stats['total_notifications']}")
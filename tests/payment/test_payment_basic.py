@@ -2,35 +2,41 @@
 """
 Basic test script for payment system functionality
 """
+import logging
 import os
 import sys
 import django
+from django.apps import apps
 
 # Setup Django
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'server.settings')
-django.setup()
+if not apps.ready:
+    django.setup()
 
 from polling.models import Player, PaymentTransaction
 from polling.payment_validation import PaymentValidationService
 from polling.fraud_detection import FraudDetectionService
 from django.utils import timezone
+from django.db import transaction
+
+log = logging.getLogger(__name__)
 
 def test_payment_validation():
     """Test payment validation functionality"""
-    print("🔍 Testing Payment Validation...")
+    log.info("🔍 Testing Payment Validation...")
     
     # Test valid deposit amount
     is_valid, error = PaymentValidationService.validate_deposit_amount(100)
-    print(f"✅ Valid deposit amount (100): {is_valid}, Error: {error}")
+    log.info(f"✅ Valid deposit amount (100): {is_valid}, Error: {error}")
     
     # Test invalid deposit amount (too small)
     is_valid, error = PaymentValidationService.validate_deposit_amount(5)
-    print(f"❌ Invalid deposit amount (5): {is_valid}, Error: {error}")
+    log.info(f"❌ Invalid deposit amount (5): {is_valid}, Error: {error}")
     
     # Test invalid deposit amount (too large)
     is_valid, error = PaymentValidationService.validate_deposit_amount(50000)
-    print(f"❌ Invalid deposit amount (50000): {is_valid}, Error: {error}")
+    log.info(f"❌ Invalid deposit amount (50000): {is_valid}, Error: {error}")
     
     # Test valid bank account info
     bank_info = {
@@ -39,7 +45,7 @@ def test_payment_validation():
         'account_holder_name': 'John Doe'
     }
     is_valid, error = PaymentValidationService.validate_bank_account_info(bank_info)
-    print(f"✅ Valid bank account info: {is_valid}, Error: {error}")
+    log.info(f"✅ Valid bank account info: {is_valid}, Error: {error}")
     
     # Test invalid bank account info
     invalid_bank_info = {
@@ -48,57 +54,55 @@ def test_payment_validation():
         'account_holder_name': 'John Doe'
     }
     is_valid, error = PaymentValidationService.validate_bank_account_info(invalid_bank_info)
-    print(f"❌ Invalid bank account info: {is_valid}, Error: {error}")
+    log.info(f"❌ Invalid bank account info: {is_valid}, Error: {error}")
     
-    print("✅ Payment validation tests completed!\n")
+    log.info("✅ Payment validation tests completed!\n")
 
 def test_fraud_detection():
     """Test fraud detection functionality"""
-    print("🛡️ Testing Fraud Detection...")
+    log.info("🛡️ Testing Fraud Detection...")
     
     # Create a test player
-    try:
-        player = Player.objects.get(username='test_fraud_user')
-    except Player.DoesNotExist:
-        player = Player.objects.create(
-            username='test_fraud_user',
-            email='test_fraud@example.com',
-            balance=1000,
-            email_verified=True,
-            created_at=timezone.now()
-        )
+    player, _ = Player.objects.get_or_create(
+        username='test_fraud_user',
+        defaults={
+            'email': 'test_fraud@example.com',
+            'balance': 1000,
+            'email_verified': True,
+            'created_at': timezone.now()
+        }
+    )
     
     # Test fraud score calculation
     risk_score, risk_factors = FraudDetectionService.calculate_fraud_score(
         player, 100, 'deposit'
     )
-    print(f"🎯 Risk score for new account: {risk_score}")
-    print(f"📋 Risk factors: {risk_factors}")
+    log.info(f"🎯 Risk score for new account: {risk_score}")
+    log.info(f"📋 Risk factors: {risk_factors}")
     
     # Test flagging logic
     should_flag, reason = FraudDetectionService.should_flag_transaction(85, ['High risk factor'])
-    print(f"🚩 Should flag high risk (85): {should_flag}, Reason: {reason}")
+    log.info(f"🚩 Should flag high risk (85): {should_flag}, Reason: {reason}")
     
     should_flag, reason = FraudDetectionService.should_flag_transaction(20, ['Low risk factor'])
-    print(f"✅ Should not flag low risk (20): {should_flag}, Reason: {reason}")
+    log.info(f"✅ Should not flag low risk (20): {should_flag}, Reason: {reason}")
     
-    print("✅ Fraud detection tests completed!\n")
+    log.info("✅ Fraud detection tests completed!\n")
 
 def test_payment_models():
     """Test payment models functionality"""
-    print("💾 Testing Payment Models...")
+    log.info("💾 Testing Payment Models...")
     
     # Create a test player
-    try:
-        player = Player.objects.get(username='test_payment_user')
-    except Player.DoesNotExist:
-        player = Player.objects.create(
-            username='test_payment_user',
-            email='test_payment@example.com',
-            balance=1000,
-            email_verified=True,
-            created_at=timezone.now()
-        )
+    player, _ = Player.objects.get_or_create(
+        username='test_payment_user',
+        defaults={
+            'email': 'test_payment@example.com',
+            'balance': 1000,
+            'email_verified': True,
+            'created_at': timezone.now()
+        }
+    )
     
     # Test PaymentTransaction creation
     payment_transaction = PaymentTransaction.objects.create(
@@ -113,13 +117,13 @@ def test_payment_models():
         is_flagged=False
     )
     
-    print(f"✅ Created PaymentTransaction: {payment_transaction}")
-    print(f"📊 Payment details: ₹{payment_transaction.amount} {payment_transaction.currency}")
-    print(f"🔒 Security: Fraud score {payment_transaction.fraud_score}, Flagged: {payment_transaction.is_flagged}")
+    log.info(f"✅ Created PaymentTransaction: {payment_transaction}")
+    log.info(f"📊 Payment details: ₹{payment_transaction.amount} {payment_transaction.currency}")
+    log.info(f"🔒 Security: Fraud score {payment_transaction.fraud_score}, Flagged: {payment_transaction.is_flagged}")
 
     # Test wallet operations
     initial_balance = player.balance
-    print(f"💰 Initial balance: ₹{initial_balance}")
+    log.info(f"💰 Initial balance: ₹{initial_balance}")
     
     # Test credit wallet
     player.credit_wallet(
@@ -127,7 +131,7 @@ def test_payment_models():
         transaction_type='deposit',
         description='Test deposit via payment gateway'
     )
-    print(f"💳 After deposit: ₹{player.balance}")
+    log.info(f"💳 After deposit: ₹{player.balance}")
 
     # Test debit wallet
     success = player.debit_wallet(
@@ -135,37 +139,36 @@ def test_payment_models():
         transaction_type='withdrawal',
         description='Test withdrawal'
     )
-    print(f"💸 After withdrawal: ₹{player.balance}, Success: {success}")
+    log.info(f"💸 After withdrawal: ₹{player.balance}, Success: {success}")
     
-    print("✅ Payment models tests completed!\n")
+    log.info("✅ Payment models tests completed!\n")
 
 def test_security_features():
     """Test security features"""
-    print("🔐 Testing Security Features...")
+    log.info("🔐 Testing Security Features...")
     
     # Test comprehensive validation
-    try:
-        player = Player.objects.get(username='test_security_user')
-    except Player.DoesNotExist:
-        player = Player.objects.create(
-            username='test_security_user',
-            email='test_security@example.com',
-            balance=1000,
-            email_verified=True,
-            created_at=timezone.now()
-        )
+    player, _ = Player.objects.get_or_create(
+        username='test_security_user',
+        defaults={
+            'email': 'test_security@example.com',
+            'balance': 1000,
+            'email_verified': True,
+            'created_at': timezone.now()
+        }
+    )
     
     # Test comprehensive payment validation
     is_valid, errors = PaymentValidationService.comprehensive_payment_validation(
         player, 100, 'deposit'
     )
-    print(f"✅ Comprehensive validation (valid): {is_valid}, Errors: {errors}")
+    log.info(f"✅ Comprehensive validation (valid): {is_valid}, Errors: {errors}")
     
     # Test with invalid amount
     is_valid, errors = PaymentValidationService.comprehensive_payment_validation(
         player, 5, 'deposit'  # Below minimum
     )
-    print(f"❌ Comprehensive validation (invalid): {is_valid}, Errors: {errors}")
+    log.info(f"❌ Comprehensive validation (invalid): {is_valid}, Errors: {errors}")
     
     # Test with unverified user
     player.email_verified = False
@@ -174,34 +177,39 @@ def test_security_features():
     is_valid, errors = PaymentValidationService.comprehensive_payment_validation(
         player, 100, 'deposit'
     )
-    print(f"❌ Unverified user validation: {is_valid}, Errors: {errors}")
+    log.info(f"❌ Unverified user validation: {is_valid}, Errors: {errors}")
     
-    print("✅ Security features tests completed!\n")
+    log.info("✅ Security features tests completed!\n")
 
 def main():
     """Run all tests"""
-    print("🚀 Starting Payment System Tests...\n")
-    
-    try:
-        test_payment_validation()
-        test_fraud_detection()
-        test_payment_models()
-        test_security_features()
+    log.info("🚀 Starting Payment System Tests...\n")
+    
+    # One transaction for the whole run, rolled back so reruns start clean
+    with transaction.atomic():
+        try:
+            test_payment_validation()
+            test_fraud_detection()
+            test_payment_models()
+            test_security_features()
         
-        print("🎉 All payment system tests completed successfully!")
-        print("\n📋 Summary:")
-        print("✅ Payment validation working")
-        print("✅ Fraud detection working")
-        print("✅ Payment models working")
-        print("✅ Security features working")
-        print("✅ Register bonus removed (balance starts at 0)")
-        print("✅ Comprehensive validation implemented")
-        print("✅ Stripe integration ready")
+            log.info("\n".join([
+                "🎉 All payment system tests completed successfully!",
+                "\n📋 Summary:",
+                "✅ Payment validation working",
+                "✅ Fraud detection working",
+                "✅ Payment models working",
+                "✅ Security features working",
+                "✅ Register bonus removed (balance starts at 0)",
+                "✅ Comprehensive validation implemented",
+                "✅ Stripe integration ready",
+            ]))
         
-    except Exception as e:
-        print(f"❌ Test failed with error: {e}")
-        import traceback
-        traceback.print_exc()
+        except Exception as e:
+            log.exception("❌ Test failed with error: %s", e)
+        finally:
+            transaction.set_rollback(True)
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
     main()
@@ -15,6 +15,7 @@ from polling.models import Player, OTPVerification, NotificationType
 from polling.security import PasswordSecurity, InputValidator
 from tests.conftest import BaseTestCase, PlayerFactory
 from tests.utils import TestClient, AssertionHelpers, setup_test_notification_types
+from tests.misc.test_settings import REAL_CACHE
 
 
 class UserRegistrationTests(BaseTestCase):
@@ -331,6 +332,7 @@ class OTPVerificationTests(BaseTestCase):
         self.assertTrue(data['success'])
         mock_resend.assert_called_once()
     
+    @override_settings(CACHES=REAL_CACHE)
     def test_otp_resend_rate_limiting(self):
         """Test OTP resend rate limiting."""
         # First resend should work